@@ -0,0 +1,321 @@
+"""Command-line interface for the DeepSeek + MCP Alpha Picks search agent."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from datetime import date
+from pathlib import Path
+import sys
+import traceback
+
+from .config import Settings
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+def _print_json(data) -> None:
+    """Print ``data`` as JSON on stdout, using orjson when available.
+
+    Output is indented on a terminal and compact when stdout is a pipe or file.
+    """
+    pretty = sys.stdout.isatty()
+    buffer = getattr(sys.stdout, "buffer", None)
+    if orjson is None or buffer is None:
+        if pretty:
+            print(json.dumps(data, ensure_ascii=False, indent=2))
+        else:
+            print(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        return
+    # Flush pending text output so the raw bytes land after it.
+    sys.stdout.flush()
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+    buffer.write(orjson.dumps(data, option=option) + b"\n")
+    buffer.flush()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python cli.py",
+        description="Check Xiaohongshu for notes related to a keyword via DeepSeek and MCP.",
+    )
+
+    parser.add_argument(
+        "--keyword",
+        default=None,
+        help="Keyword to search for (default: 'alpha pick <today>').",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=10,
+        help="Number of notes to request from the MCP tool.",
+    )
+    parser.add_argument(
+        "--sort",
+        default="time_descending",
+        choices=["general", "time_descending", "popularity_descending"],
+        help="Sort order for the search results.",
+    )
+    parser.add_argument(
+        "--note-type",
+        type=int,
+        default=2,
+        choices=[0, 1, 2],
+        help="Note type: 0=all, 1=video, 2=image+text (default: 2 for OCR).",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=2,
+        help="Filter notes to last N days (default: 2).",
+    )
+    parser.add_argument(
+        "--max-results",
+        type=int,
+        default=1,
+        help="Maximum number of high-quality results to keep (default: 1).",
+    )
+    parser.add_argument(
+        "--today",
+        action="store_true",
+        help="Filter results to today's date only and generate summary for today.",
+    )
+    parser.add_argument(
+        "--log-dir",
+        type=str,
+        default="alpha_picks_logs",
+        help="Directory to save daily log files (default: 'alpha_picks_logs').",
+    )
+    parser.add_argument(
+        "--no-log",
+        action="store_true",
+        help="Skip saving to daily log file.",
+    )
+    parser.add_argument(
+        "--bom",
+        action="store_true",
+        help="Start new log files with a UTF-8 BOM (helps older Windows editors).",
+    )
+    parser.add_argument(
+        "--show-raw",
+        action="store_true",
+        help="Print structured tool output JSON for debugging.",
+    )
+    parser.add_argument(
+        "--show-json",
+        action="store_true",
+        help="Print processed notes as JSON.",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Print debug information including connection URLs and tool discovery.",
+    )
+
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    args = _PARSER.parse_args(argv)
+    if args.keyword is None:
+        args.keyword = f"alpha pick {date.today().isoformat()}"
+    return args
+
+
+async def _run_async(args: argparse.Namespace) -> int:
+    try:
+        settings = Settings.load()
+    except RuntimeError as exc:
+        if "DEEPSEEK_API_KEY" in str(exc):
+            print(f"[ERROR] {exc}", file=sys.stderr)
+            print("\nPlease set DEEPSEEK_API_KEY environment variable.", file=sys.stderr)
+            return 1
+        raise
+
+    if args.debug:
+        sys.stderr.write(
+            "Configuration:\n"
+            f"  DeepSeek API Base: {settings.deepseek_base_url}\n"
+            f"  DeepSeek Model: {settings.deepseek_model}\n"
+            "  MCP Server Candidates:\n"
+            + "".join(f"    - {url}\n" for url in settings.mcp_server_candidates)
+        )
+
+    try:
+        return await _search_and_report(args, settings)
+    finally:
+        # Close pooled MCP sessions (only if the MCP client was ever loaded),
+        # then the shared HTTP client's connections.
+        mcp_client = sys.modules.get(f"{__package__}.mcp_client")
+        if mcp_client is not None:
+            await mcp_client.close_pool()
+        await settings.aclose()
+
+
+async def _search_and_report(args: argparse.Namespace, settings: Settings) -> int:
+    # Deferred so --help and configuration errors don't pay for openai/mcp imports.
+    from .daily_logger import save_daily_summary
+    from .llm_agent import AlphaPickSearchAgent
+    from .mcp_client import MCPConnectionError, MCPToolNotFound
+
+    agent = AlphaPickSearchAgent(settings)
+
+    # Determine scan mode
+    filter_today = args.today
+    filter_latest_date = not args.today  # If not today, use latest date mode
+    
+    if filter_today:
+        print("📅 SCAN MODE: TODAY - Filtering results to today's date only", file=sys.stderr)
+    else:
+        print("📅 SCAN MODE: LATEST DATE - Finding latest post(s) by date", file=sys.stderr)
+
+    try:
+        outcome = await agent.search_keyword(
+            args.keyword,
+            count=args.count,
+            sort=args.sort,
+            note_type=args.note_type,
+            days_filter=args.days,
+            max_results=args.max_results,
+            filter_today=filter_today,
+            filter_latest_date=filter_latest_date,
+        )
+    except MCPConnectionError as exc:
+        base_url = settings.mcp_server_candidates[0] if settings.mcp_server_candidates else "http://127.0.0.1:18060"
+        sys.stderr.write(
+            f"[ERROR] MCP connection failed: {exc}\n"
+            "\nTried connecting to:\n"
+            + "".join(f"  - {url}\n" for url in settings.mcp_server_candidates)
+            + "\nPlease ensure the Xiaohongshu MCP server is running.\n"
+            "You can check if it's accessible by visiting:\n"
+            f"  {base_url}/\n"
+        )
+        return 2
+    except MCPToolNotFound as exc:
+        print(f"[ERROR] MCP tool lookup failed: {exc}", file=sys.stderr)
+        print("\nThe MCP server is connected but doesn't expose the expected search tool.", file=sys.stderr)
+        return 3
+    except Exception as exc:
+        print(f"[ERROR] Unexpected error: {exc}", file=sys.stderr)
+        traceback.print_exc()
+        return 4
+
+    print(f"Connected MCP server via: {outcome.connected_url}")
+    print(f"Using MCP tool: {outcome.tool_name}")
+    print(f"Keyword: {outcome.keyword}")
+    if outcome.target_date:
+        date_str = outcome.target_date.date().isoformat()
+        print(f"Target date: {date_str} ({outcome.scan_mode} mode)")
+    print(f"Keeping top {args.max_results} high-quality result(s)")
+    
+    # Display processed notes
+    if outcome.processed_notes:
+        high_quality_count = sum(1 for n in outcome.processed_notes if n.is_high_quality)
+        if high_quality_count > 0:
+            print(f"\nFound {high_quality_count} high-quality note(s) (out of {len(outcome.processed_notes)} total):\n")
+        else:
+            print(f"\nFound {len(outcome.processed_notes)} note(s), but none meet high-quality criteria:\n")
+        # Build the listing once and write it in a single call
+        buf: list[str] = []
+        for i, note in enumerate(outcome.processed_notes, 1):
+            buf.append(
+                f"Note {i}:\n"
+                f"  Title: {note.title or 'N/A'}\n"
+                f"  Author: {note.author or 'N/A'}\n"
+                f"  Selection Date: {note.selection_date or 'N/A'}\n"
+                f"  Publish Time: {note.publish_time or 'N/A'}\n"
+                f"  Quality Score: {note.quality_score:.2f}\n"
+                f"  Quality Notes: {', '.join(note.quality_notes)}\n"
+                f"  URL: {note.url or 'N/A'}\n"
+                f"  Post Text: {(note.post_text or '')[:200]}...\n"
+                f"  OCR Text: {(note.ocr_text or '')[:200]}...\n"
+                "\n"
+            )
+        sys.stdout.write("".join(buf))
+    else:
+        print("\nNo high-quality notes found matching criteria.")
+        print("Summary from LLM:\n---------")
+        if outcome.summary:
+            print(outcome.summary)
+        else:
+            print("(No summary returned.)")
+
+    # Show JSON output if requested
+    if args.show_json:
+        print("\nProcessed Notes (JSON):\n----------------")
+        notes_data = [note.to_dict() for note in outcome.processed_notes]
+        _print_json(notes_data)
+
+    # Save to daily log file (using raw dump for faster, reliable encoding)
+    if not args.no_log and outcome.processed_notes:
+        print("\nSaving notes to daily log file...")
+        try:
+            log_path = await save_daily_summary(
+                outcome.processed_notes,
+                settings,
+                log_dir=args.log_dir,
+                date=outcome.target_date,
+                mode=outcome.scan_mode,
+                use_raw_dump=True,  # Use raw dump instead of LLM summary
+                bom=args.bom,
+            )
+            print(f"\nSaved daily log to: {log_path}")
+            print(f"Log includes: post text, OCR text, selection dates, and quality scores.")
+        except Exception as exc:
+            print(f"\n[WARNING] Failed to save daily log: {exc}", file=sys.stderr)
+            traceback.print_exc()
+    elif outcome.processed_notes:
+        print("\n(Skipping log save as --no-log was specified)")
+    elif not outcome.processed_notes:
+        print("\n(No notes to log)")
+
+    if args.show_raw:
+        print("\nRaw MCP payload:\n----------------")
+        _print_json(outcome.raw_results)
+
+    return 0
+
+
+def _fast_event_loop_factory():
+    """Return uvloop's (or winloop's on Windows) loop factory when installed."""
+    try:
+        if sys.platform == "win32":
+            import winloop as loop_impl
+        else:
+            import uvloop as loop_impl
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return loop_impl.new_event_loop
+
+
+def _run_event_loop(coro):
+    # asyncio.Runner (and its loop_factory) only exists on Python 3.11+
+    loop_factory = _fast_event_loop_factory() if hasattr(asyncio, "Runner") else None
+    if loop_factory is None:
+        return asyncio.run(coro)
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(coro)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        return _run_event_loop(_run_async(args))
+    except RuntimeError as exc:  # noqa: BLE001
+        message = str(exc)
+        if "DEEPSEEK_API_KEY" in message:
+            print(f"[ERROR] {message}", file=sys.stderr)
+            return 1
+        raise
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,23 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
+from functools import lru_cache
 import os
-from typing import List
+from typing import TYPE_CHECKING, Any
+import weakref
+
+if TYPE_CHECKING:
+    import httpx
 
 
 DEFAULT_MCP_BASE_URL = "http://127.0.0.1:18060"
 DEFAULT_DEEPSEEK_BASE_URL = "https://api.deepseek.com"
 DEFAULT_DEEPSEEK_MODEL = "deepseek-chat"
-
-
-def _dedupe_preserve_order(urls: List[str]) -> List[str]:
-    seen: set[str] = set()
-    ordered: list[str] = []
-    for url in urls:
-        if url not in seen:
-            ordered.append(url)
-            seen.add(url)
-    return ordered
+DEFAULT_DEEPSEEK_PLANNING_MODEL = "deepseek-chat"  # Tool-call planning only needs the cheaper model
 
 
 @dataclass(slots=True)
@@ -27,9 +24,16 @@ class Settings:
     deepseek_api_key: str
     deepseek_base_url: str = DEFAULT_DEEPSEEK_BASE_URL
     deepseek_model: str = DEFAULT_DEEPSEEK_MODEL
-    mcp_server_candidates: list[str] = field(default_factory=list)
+    deepseek_planning_model: str = DEFAULT_DEEPSEEK_PLANNING_MODEL
+    mcp_server_candidates: tuple[str, ...] = ()
+    # One HTTP client per event loop: ``load()`` is memoised, and an httpx
+    # client's pooled connections are bound to the loop that opened them
+    _http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False, compare=False
+    )
 
     @classmethod
+    @lru_cache(maxsize=1)
     def load(cls) -> "Settings":
         key = os.getenv("DEEPSEEK_API_KEY")
         if not key:
@@ -38,6 +42,7 @@ class Settings:
         base_url = os.getenv("XHS_MCP_BASE_URL", DEFAULT_MCP_BASE_URL).rstrip("/")
         deepseek_base_url = os.getenv("DEEPSEEK_BASE_URL", DEFAULT_DEEPSEEK_BASE_URL).rstrip("/")
         deepseek_model = os.getenv("DEEPSEEK_MODEL", DEFAULT_DEEPSEEK_MODEL)
+        deepseek_planning_model = os.getenv("DEEPSEEK_PLANNING_MODEL", DEFAULT_DEEPSEEK_PLANNING_MODEL)
 
         # Try different MCP endpoint formats:
         # The xiaohongshu-mcp server exposes the MCP endpoint at /mcp
@@ -59,6 +64,32 @@ class Settings:
             deepseek_api_key=key,
             deepseek_base_url=deepseek_base_url,
             deepseek_model=deepseek_model,
-            mcp_server_candidates=_dedupe_preserve_order(candidates),
+            deepseek_planning_model=deepseek_planning_model,
+            mcp_server_candidates=tuple(dict.fromkeys(candidates)),
         )
 
+    def http_client(self) -> "httpx.AsyncClient":
+        """Return the running loop's pooled HTTP client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None or client.is_closed:
+            import httpx
+
+            client = self._http_clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_keepalive_connections=100,
+                    max_connections=200,
+                    keepalive_expiry=30,
+                ),
+                # AsyncOpenAI adopts a custom client's timeout as its own, so keep the
+                # SDK's 600 s read budget for long completions and batch uploads;
+                # only the connect timeout is tightened.
+                timeout=httpx.Timeout(600.0, connect=5.0),
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """Close the running loop's HTTP client if one was created."""
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
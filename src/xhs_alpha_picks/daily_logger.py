@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import codecs
 from datetime import datetime
+import hashlib
+import io
+import json
+import os
 from pathlib import Path
-from typing import List
-
-from openai import AsyncOpenAI
+from typing import TYPE_CHECKING, List, TextIO
 
 from .config import Settings
 from .note_processor import ProcessedNote
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 
 SUMMARY_PROMPT = """Analyze the following Xiaohongshu posts about Seeking Alpha's Alpha Picks service. 
 Extract and summarize the key information in a structured format:
@@ -45,63 +52,176 @@ Format your response clearly with sections for each category. Make sure to extra
 
 If multiple posts are provided, consolidate the information across all posts. If dates differ, organize by date with clear headings."""
 
+# Fixed prompt pieces are built once; the fixed text always comes first in
+# each message so DeepSeek's prompt-prefix cache can hit across calls.
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert financial analyst specializing in summarizing Alpha Picks selections from Seeking Alpha. Extract structured information about stock picks, recommendations, and analysis. Always clearly mark the post date at the beginning of your summary.",
+}
+_POST_CONTENT_SEP = "\n\n--- Post Content ---\n\n"
+_BATCH_SUMMARIES_SEP = "\n\n--- Batch Summaries ---\n\n"
+
+REDUCE_PROMPT = """The posts below were too long to analyze in a single request, so they were split into batches and each batch was summarized separately.
+Merge the following batch summaries into ONE summary using the same structure (selection date, added companies, removed companies, recommendations summary, key analysis points).
+Remove duplicates, keep every distinct stock symbol, and keep the post date clearly marked at the beginning."""
+
+# Map-reduce settings for large note batches
+MAX_CHUNK_TOKENS = 24_000  # Rough per-request budget (estimated as len(text) // 4)
+MAX_CONCURRENT_REQUESTS = 10
+MAX_RETRIES = 5  # Passed to AsyncOpenAI, which retries with jittered exponential backoff
+
+
+def _chunk_notes(note_texts: List[str], max_tokens: int = MAX_CHUNK_TOKENS) -> List[List[str]]:
+    """Group note texts into batches whose estimated token count stays under ``max_tokens``."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in note_texts:
+        tokens = len(text) // 4
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summary_cache_key(*parts: str) -> str:
+    """Return a stable SHA-256 key for the exact prompt pieces sent to DeepSeek."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _read_cached_summary(cache_path: Path) -> str | None:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)["summary"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cached_summary(cache_path: Path, summary: str, model: str) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "summary": summary,
+        "model": model,
+        "created": datetime.now().isoformat(sep=" ", timespec="seconds"),
+    }
+    # Write to a temporary file first so readers never see a partial entry
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
 
 async def generate_daily_summary(
     notes: List[ProcessedNote],
     settings: Settings,
     target_date: datetime | None = None,
+    cache_dir: str | Path | None = None,
 ) -> str:
-    """Generate a comprehensive summary of processed notes using DeepSeek."""
+    """
+    Generate a comprehensive summary of processed notes using DeepSeek.
+    
+    If ``cache_dir`` is given, summaries are cached there keyed by a SHA-256
+    hash of the model and full prompt, so identical reruns skip the API call.
+    """
     
     if not notes:
         return "No notes provided for summarization."
     
-    client = AsyncOpenAI(
-        api_key=settings.deepseek_api_key,
-        base_url=settings.deepseek_base_url,
-    )
-    
     # Combine all note content
-    notes_content = []
-    for i, note in enumerate(notes, 1):
-        note_text = f"--- Note {i} ---\n"
-        note_text += f"Title: {note.title or 'N/A'}\n"
-        note_text += f"Author: {note.author or 'N/A'}\n"
-        note_text += f"Selection Date: {note.selection_date or 'N/A'}\n"
-        note_text += f"Publish Time: {note.publish_time or 'N/A'}\n"
-        note_text += f"URL: {note.url or 'N/A'}\n\n"
-        note_text += f"Post Text:\n{note.post_text or 'N/A'}\n\n"
-        note_text += f"OCR Text (from images):\n{note.ocr_text or 'N/A'}\n\n"
-        note_text += f"Quality Score: {note.quality_score:.2f}\n"
-        note_text += f"Quality Notes: {', '.join(note.quality_notes)}\n"
-        note_text += "=" * 80 + "\n\n"
-        notes_content.append(note_text)
-    
-    combined_content = "\n".join(notes_content)
+    separator = "=" * 80
+    notes_content = [
+        "\n".join((
+            f"--- Note {i} ---",
+            f"Title: {note.title or 'N/A'}",
+            f"Author: {note.author or 'N/A'}",
+            f"Selection Date: {note.selection_date or 'N/A'}",
+            f"Publish Time: {note.publish_time or 'N/A'}",
+            f"URL: {note.url or 'N/A'}",
+            "",
+            "Post Text:",
+            note.post_text or "N/A",
+            "",
+            "OCR Text (from images):",
+            note.ocr_text or "N/A",
+            "",
+            f"Quality Score: {note.quality_score:.2f}",
+            f"Quality Notes: {', '.join(note.quality_notes)}",
+            separator,
+            "",
+            "",
+        ))
+        for i, note in enumerate(notes, 1)
+    ]
     
     # Add date context to prompt
     date_context = ""
     if target_date:
-        date_str = target_date.strftime("%Y-%m-%d")
+        date_str = target_date.date().isoformat()
         date_context = f"\n\nIMPORTANT: These posts are from {date_str}. Please mark this date prominently in your summary if it's not already clear from the post content."
     
-    # Generate summary using DeepSeek
-    completion = await client.chat.completions.create(
-        model=settings.deepseek_model,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an expert financial analyst specializing in summarizing Alpha Picks selections from Seeking Alpha. Extract structured information about stock picks, recommendations, and analysis. Always clearly mark the post date at the beginning of your summary.",
-            },
-            {
-                "role": "user",
-                "content": f"{SUMMARY_PROMPT}{date_context}\n\n--- Post Content ---\n\n{combined_content}",
-            },
-        ],
-        temperature=0.3,
+    cache_path: Path | None = None
+    if cache_dir is not None:
+        cache_key = _summary_cache_key(
+            settings.deepseek_model,
+            _SYSTEM_MESSAGE["content"],
+            SUMMARY_PROMPT,
+            REDUCE_PROMPT,
+            date_context,
+            *notes_content,
+        )
+        cache_path = Path(cache_dir) / f"{cache_key}.json"
+        cached_summary = await asyncio.to_thread(_read_cached_summary, cache_path)
+        if cached_summary is not None:
+            return cached_summary
+    
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(
+        api_key=settings.deepseek_api_key,
+        base_url=settings.deepseek_base_url,
+        http_client=settings.http_client(),
+        max_retries=MAX_RETRIES,
+    )
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async def _summarize(user_content: str) -> str:
+        async with semaphore:
+            completion = await client.chat.completions.create(
+                model=settings.deepseek_model,
+                messages=[_SYSTEM_MESSAGE, {"role": "user", "content": user_content}],
+                temperature=0.3,
+            )
+            return completion.choices[0].message.content or ""
+    
+    # Generate summary using DeepSeek. Large batches are summarized chunk by
+    # chunk concurrently, then merged with a final reduce call.
+    chunks = _chunk_notes(notes_content)
+    partial_summaries = await asyncio.gather(
+        *(
+            _summarize("".join((SUMMARY_PROMPT, date_context, _POST_CONTENT_SEP, "\n".join(chunk))))
+            for chunk in chunks
+        )
     )
+    if len(partial_summaries) == 1:
+        summary = partial_summaries[0]
+    else:
+        combined_summaries = "\n\n".join(
+            f"--- Batch {i} ---\n{partial}" for i, partial in enumerate(partial_summaries, 1)
+        )
+        summary = await _summarize("".join((REDUCE_PROMPT, date_context, _BATCH_SUMMARIES_SEP, combined_summaries)))
     
-    summary = completion.choices[0].message.content or "Failed to generate summary."
+    if not summary:
+        return "Failed to generate summary."
+    if cache_path is not None:
+        await asyncio.to_thread(_write_cached_summary, cache_path, summary, settings.deepseek_model)
     return summary
 
 
@@ -127,58 +247,85 @@ def get_daily_log_path(
     if date is None:
         date = datetime.now()
     
-    date_str = date.strftime("%Y-%m-%d")
+    date_str = date.date().isoformat()
     filename = f"{date_str}_{mode}.txt"
     return log_dir / filename
 
 
-def create_raw_dump(notes: List[ProcessedNote], date: datetime | None = None) -> str:
-    """Create a raw dump of notes without LLM processing."""
+def write_raw_dump(
+    fp: TextIO,
+    notes: List[ProcessedNote],
+    date: datetime | None = None,
+) -> None:
+    """Stream a raw dump of notes into ``fp`` without LLM processing."""
     if date is None:
         date = datetime.now()
     
-    lines = []
-    lines.append(f"Alpha Picks Summary - {date.strftime('%Y-%m-%d')}")
-    lines.append("=" * 80)
-    lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append(f"Number of Notes: {len(notes)}")
-    lines.append("-" * 80)
-    lines.append("")
+    write = fp.write
+    write(f"Alpha Picks Summary - {date.date().isoformat()}\n")
+    write("=" * 80 + "\n")
+    write(f"Generated: {datetime.now().isoformat(sep=' ', timespec='seconds')}\n")
+    write(f"Number of Notes: {len(notes)}\n")
+    write("-" * 80 + "\n")
     
     for i, note in enumerate(notes, 1):
-        lines.append(f"Note {i}:")
-        lines.append(f"  Note ID: {note.note_id}")
-        lines.append(f"  Title: {note.title or 'N/A'}")
-        lines.append(f"  Author: {note.author or 'N/A'}")
-        lines.append(f"  Selection Date: {note.selection_date or 'N/A'}")
-        lines.append(f"  Publish Time: {note.publish_time or 'N/A'}")
-        lines.append(f"  URL: {note.url or 'N/A'}")
-        lines.append(f"  Quality Score: {note.quality_score:.2f}")
-        lines.append(f"  High Quality: {note.is_high_quality}")
-        lines.append(f"  Quality Notes: {', '.join(note.quality_notes)}")
-        lines.append("")
-        lines.append("  Post Text:")
-        lines.append("  " + "-" * 76)
+        write("\n")
+        write(f"Note {i}:\n")
+        write(f"  Note ID: {note.note_id}\n")
+        write(f"  Title: {note.title or 'N/A'}\n")
+        write(f"  Author: {note.author or 'N/A'}\n")
+        write(f"  Selection Date: {note.selection_date or 'N/A'}\n")
+        write(f"  Publish Time: {note.publish_time or 'N/A'}\n")
+        write(f"  URL: {note.url or 'N/A'}\n")
+        write(f"  Quality Score: {note.quality_score:.2f}\n")
+        write(f"  High Quality: {note.is_high_quality}\n")
+        write(f"  Quality Notes: {', '.join(note.quality_notes)}\n")
+        write("\n")
+        write("  Post Text:\n")
+        write("  " + "-" * 76 + "\n")
         if note.post_text:
             # Indent each line
-            for line in note.post_text.split('\n'):
-                lines.append(f"  {line}")
+            write("  " + note.post_text.replace("\n", "\n  ") + "\n")
         else:
-            lines.append("  (No post text)")
-        lines.append("")
-        lines.append("  OCR Text (from images):")
-        lines.append("  " + "-" * 76)
+            write("  (No post text)\n")
+        write("\n")
+        write("  OCR Text (from images):\n")
+        write("  " + "-" * 76 + "\n")
         if note.ocr_text:
             # Indent each line
-            for line in note.ocr_text.split('\n'):
-                lines.append(f"  {line}")
+            write("  " + note.ocr_text.replace("\n", "\n  ") + "\n")
         else:
-            lines.append("  (No OCR text)")
-        lines.append("")
-        lines.append("=" * 80)
-        lines.append("")
-    
-    return "\n".join(lines)
+            write("  (No OCR text)\n")
+        write("\n")
+        write("=" * 80 + "\n")
+
+
+def create_raw_dump(notes: List[ProcessedNote], date: datetime | None = None) -> str:
+    """Create a raw dump of notes without LLM processing."""
+    buffer = io.StringIO()
+    write_raw_dump(buffer, notes, date)
+    return buffer.getvalue()
+
+
+def _write_raw_dump_file(
+    log_path: Path,
+    file_mode: str,
+    notes: List[ProcessedNote],
+    date: datetime | None,
+    bom: bool,
+) -> None:
+    # utf-8-sig only emits the BOM at the start of a new file, never on append
+    encoding = "utf-8-sig" if bom else "utf-8"
+    with open(log_path, file_mode, encoding=encoding, newline='\n', buffering=1 << 20) as f:
+        write_raw_dump(f, notes, date)
+
+
+def _write_text_file(log_path: Path, file_mode: str, content: str, bom: bool) -> None:
+    data = content.encode("utf-8")
+    if bom and file_mode == "w":
+        data = codecs.BOM_UTF8 + data
+    with open(log_path, file_mode + "b") as f:
+        f.write(data)
 
 
 async def save_daily_summary(
@@ -188,6 +335,8 @@ async def save_daily_summary(
     date: datetime | None = None,
     mode: str = "today",
     use_raw_dump: bool = True,
+    use_cache: bool = True,
+    bom: bool = False,
 ) -> Path:
     """
     Save notes to a daily log file.
@@ -199,41 +348,47 @@ async def save_daily_summary(
         date: Target date for the log
         mode: "today" or "latest"
         use_raw_dump: If True, use raw dump instead of LLM summary (faster, no encoding issues)
+        use_cache: If True, reuse cached LLM summaries from ``{log_dir}/.cache``
+        bom: If True, start new log files with a UTF-8 BOM (for Windows Notepad)
     """
     
     # Get log file path
     log_path = get_daily_log_path(log_dir, date, mode)
     
+    # Append to file if it already exists, otherwise create new
+    file_mode = "a" if log_path.exists() else "w"
+    
     if use_raw_dump:
-        # Use raw dump - faster and avoids encoding issues
-        content = create_raw_dump(notes, date)
+        # Use raw dump - faster and avoids encoding issues. Stream it straight
+        # into the file from a worker thread so the event loop keeps running.
+        await asyncio.to_thread(_write_raw_dump_file, log_path, file_mode, notes, date, bom)
+        return log_path
+    
+    # Generate summary using LLM (slower, may have encoding issues)
+    summary = await generate_daily_summary(
+        notes,
+        settings,
+        target_date=date,
+        cache_dir=Path(log_dir) / ".cache" if use_cache else None,
+    )
+    
+    if file_mode == "a":
+        # Add separator for multiple runs in the same day
+        content = "\n" + "=" * 80 + "\n"
+        content += f"Additional Update - {datetime.now().strftime('%H:%M:%S')}\n"
+        content += "=" * 80 + "\n\n" + summary + "\n\n"
     else:
-        # Generate summary using LLM (slower, may have encoding issues)
-        summary = await generate_daily_summary(notes, settings, target_date=date)
-        
         if date is None:
             date = datetime.now()
         
-        header = f"Alpha Picks Summary - {date.strftime('%Y-%m-%d')}\n"
+        header = f"Alpha Picks Summary - {date.date().isoformat()}\n"
         header += "=" * 80 + "\n\n"
-        header += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        header += f"Generated: {datetime.now().isoformat(sep=' ', timespec='seconds')}\n"
         header += f"Number of Notes Analyzed: {len(notes)}\n\n"
         header += "-" * 80 + "\n\n"
         
         content = header + summary + "\n\n" + "-" * 80 + "\n\n"
     
-    # Append to file if it already exists, otherwise create new
-    file_mode = "a" if log_path.exists() else "w"
-    
-    if file_mode == "a" and not use_raw_dump:
-        # Add separator for multiple runs in the same day (only for LLM summaries)
-        content = "\n" + "=" * 80 + "\n"
-        content += f"Additional Update - {datetime.now().strftime('%H:%M:%S')}\n"
-        content += "=" * 80 + "\n\n" + summary + "\n\n"
-    
-    # Write with UTF-8 BOM for proper encoding detection
-    with open(log_path, file_mode, encoding="utf-8-sig", newline='\n') as f:
-        f.write(content)
+    await asyncio.to_thread(_write_text_file, log_path, file_mode, content, bom)
     
     return log_path
-
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager, nullcontext
 from dataclasses import dataclass
 from datetime import datetime
 import json
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from openai import AsyncOpenAI
 
 from .config import Settings
-from .mcp_client import connect_via_candidates, locate_search_notes_tool, simplify_call_result
+from .mcp_client import (
+    MCPConnection,
+    connect_via_candidates,
+    locate_search_notes_tool,
+    pooled_connection,
+    simplify_call_result,
+)
 from .note_processor import process_notes, ProcessedNote
 
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
 
 SYSTEM_PROMPT = (
     "You are an expert investment researcher analyzing Xiaohongshu (RED) posts about Seeking Alpha's Alpha Picks service. "
@@ -24,7 +38,80 @@ SYSTEM_PROMPT = (
     "Focus on finding the most recent and highest quality posts that represent official Alpha Picks selections."
 )
 
+# Kept free of per-call values so the system + instruction prefix is byte-stable
+# and hits the provider's prompt cache; KEYWORD/COUNT/NOTE_TYPE follow in a last turn.
+SEARCH_INSTRUCTIONS = (
+    "Search for the MOST RECENT Xiaohongshu notes about the KEYWORD given in the next message. "
+    "Find posts that contain Alpha Picks stock selections with multiple picks (not just 1-2). "
+    "IMPORTANT: Use ONLY these filter parameters: note_type and sort_by. "
+    "Do NOT use publish_time filter - date filtering will be done after retrieval. "
+    "Search parameters: note_type=NOTE_TYPE, sort_by=latest first (最新) - sorted by most recent. "
+    "Return as many recent notes as possible (up to COUNT or more if available). "
+    "The tool will return raw note data with images - we will extract OCR text and filter by date separately."
+)
+
+NOTE_TYPE_DESCRIPTIONS = {0: "all types", 1: "video only", 2: "image+text only"}
+
+# Tool filter values: note_type (0=all, 1=video, 2=image+text) and sort order
+_NOTE_TYPE_MAP = {0: "不限", 1: "视频", 2: "图文"}
+_SORT_MAP = {
+    "general": "综合",
+    "time_descending": "最新",
+    "popularity_descending": "最多点赞",
+}
+
+# Tool result text chunks are parsed on the hot path; prefer orjson when installed.
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps_compact(data: Any) -> str:
+    """Serialize ``data`` to compact JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+# Candidate source keys per output field, tried in order by the note converters
+_NOTE_ID_KEYS = ("id", "note_id", "noteId")
+_DETAIL_NOTE_ID_KEYS = ("note_id", "id", "noteId")
+_NICKNAME_KEYS = ("nickname", "nickName")
+_DETAIL_TEXT_FIELDS = (
+    ("title", ("title", "display_title", "displayTitle", "note_title")),
+    ("description", ("desc", "description", "note_desc", "content")),
+)
+_DETAIL_TIME_KEYS = ("time", "timestamp", "create_time", "publish_time", "created_at")
+_DETAIL_URL_KEYS = ("url", "note_url", "share_link", "link")
+_DETAIL_INTERACT_FIELDS = (
+    ("liked_count", ("liked_count", "likedCount")),
+    ("comment_count", ("comment_count", "commentCount")),
+    ("shared_count", ("shared_count", "sharedCount")),
+)
+
+
+def _first_of(source: Dict[str, Any], keys: Tuple[str, ...], default: Any = None) -> Any:
+    """Return the first truthy value among ``keys``, like ``get(k1) or get(k2, default)``."""
+    for key in keys:
+        value = source.get(key)
+        if value:
+            return value
+    return source.get(keys[-1], default)
+
+
+def _usage_dict(usage: Any) -> dict | None:
+    """Return a completion's usage as a dict, keeping DeepSeek's prompt-cache counters."""
+    if usage is None:
+        return None
+    # exclude_none drops unset detail fields; extra fields such as
+    # prompt_cache_hit_tokens / prompt_cache_miss_tokens are preserved.
+    return usage.model_dump(exclude_none=True)
+
+
 LLM_TOOL_NAME = "search_xiaohongshu_notes"
+DETAIL_TOOL_NAME = "get_feed_detail"
+MAX_CONCURRENT_DETAIL_FETCHES = 8  # Concurrent get_feed_detail calls per search
+DETAIL_CACHE_SIZE = 512  # Note details remembered across searches by one agent
+BATCH_POLL_INTERVAL = 30.0  # Seconds between Batch API status checks
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
 
 
 @dataclass(slots=True)
@@ -49,7 +136,55 @@ class AlphaPickSearchAgent:
         self._client = AsyncOpenAI(
             api_key=settings.deepseek_api_key,
             base_url=settings.deepseek_base_url,
+            http_client=settings.http_client(),
         )
+        # Populated while the agent is used as ``async with agent:``
+        self._exit_stack: AsyncExitStack | None = None
+        self._session_state: tuple[MCPConnection, str, dict[str, Any]] | None = None
+        # LRU of simplified get_feed_detail payloads keyed by (note_id, xsec_token)
+        self._detail_cache: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+
+    async def __aenter__(self) -> "AlphaPickSearchAgent":
+        """Connect once and reuse the MCP session for every ``search_keyword`` call."""
+        stack = AsyncExitStack()
+        try:
+            connection = await stack.enter_async_context(
+                connect_via_candidates(self._settings.mcp_server_candidates)
+            )
+            self._session_state = (connection, *self._discover_search_tool(connection))
+        except BaseException:
+            await stack.aclose()
+            raise
+        self._exit_stack = stack
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        stack, self._exit_stack, self._session_state = self._exit_stack, None, None
+        if stack is not None:
+            await stack.__aexit__(*exc_info)
+
+    @staticmethod
+    def _discover_search_tool(connection: MCPConnection) -> tuple[str, dict[str, Any]]:
+        """Locate the MCP search tool and build the function spec offered to DeepSeek."""
+        tool_name, tool = locate_search_notes_tool(connection.group.tools)
+        tool_spec = {
+            "type": "function",
+            "function": {
+                "name": LLM_TOOL_NAME,
+                "description": tool.description or "Search for Xiaohongshu notes by keyword.",
+                "parameters": tool.inputSchema,
+            },
+        }
+        return tool_name, tool_spec
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[tuple[MCPConnection, str, dict[str, Any]]]:
+        """Yield the cached session, or a pooled connection outside ``async with``."""
+        if self._session_state is not None:
+            yield self._session_state
+            return
+        async with pooled_connection(self._settings.mcp_server_candidates) as connection:
+            yield (connection, *self._discover_search_tool(connection))
 
     async def search_keyword(
         self,
@@ -62,101 +197,96 @@ class AlphaPickSearchAgent:
         max_results: int = 1,  # Keep top N high-quality results
         filter_today: bool = False,  # Filter to today only
         filter_latest_date: bool = False,  # Filter to latest date found
+        skip_planning: bool = True,  # Call the search tool directly, without a planning LLM round
+        summarize: bool = True,  # Request the DeepSeek summary (search_keywords_batch defers it)
     ) -> SearchOutcome:
-        """Ask DeepSeek to look for Xiaohongshu notes about the supplied keyword."""
+        """Ask DeepSeek to look for Xiaohongshu notes about the supplied keyword.
+
+        Inside ``async with agent:`` the MCP connection and tool lookup are
+        reused across calls; otherwise the session comes from the module-level
+        pool in ``mcp_client.pooled_connection`` (shared by concurrent calls and
+        closed by ``close_pool``).
 
-        async with connect_via_candidates(self._settings.mcp_server_candidates) as connection:
+        The search arguments are always overridden from ``keyword``/``note_type``/
+        ``sort``, so by default the tool is called directly and only the summary
+        round goes to DeepSeek. Pass ``skip_planning=False`` to let DeepSeek
+        plan the tool calls first.
+        """
+
+        async with self._session() as (connection, tool_name, tool_spec):
             # Access tools from the session group
             # Note: tools should be available after connecting to the MCP server
             tools = connection.group.tools
-            tool_name, tool = locate_search_notes_tool(tools)
-
-            tool_spec = {
-                "type": "function",
-                "function": {
-                    "name": LLM_TOOL_NAME,
-                    "description": tool.description or "Search for Xiaohongshu notes by keyword.",
-                    "parameters": tool.inputSchema,
-                },
-            }
 
-            # Always use time_descending for most recent notes
-            sort = "time_descending"
-            
             # Map note_type to human-readable description
-            note_type_desc = {0: "all types", 1: "video only", 2: "image+text only"}.get(note_type, "all types")
-            sort_desc = "latest first (最新) - sorted by most recent"
-            
+            note_type_desc = NOTE_TYPE_DESCRIPTIONS.get(note_type, "all types")
+
             base_messages: list[dict[str, Any]] = [
                 {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": SEARCH_INSTRUCTIONS},
                 {
                     "role": "user",
-                    "content": (
-                        f"Search for the MOST RECENT Xiaohongshu notes about '{keyword}'. "
-                        f"Find posts that contain Alpha Picks stock selections with multiple picks (not just 1-2). "
-                        f"IMPORTANT: Use ONLY these filter parameters: note_type and sort_by. "
-                        f"Do NOT use publish_time filter - date filtering will be done after retrieval. "
-                        f"Search parameters: note_type={note_type_desc}, sort_by={sort_desc}. "
-                        f"Return as many recent notes as possible (up to {count} or more if available). "
-                        f"The tool will return raw note data with images - we will extract OCR text and filter by date separately."
-                    ),
+                    "content": f"KEYWORD: {keyword}\nCOUNT: {count}\nNOTE_TYPE: {note_type_desc}",
                 },
             ]
 
-            initial_completion = await self._client.chat.completions.create(
-                model=self._settings.deepseek_model,
-                temperature=0,
-                messages=base_messages,
-                tools=[tool_spec],
-                tool_choice="auto",
-            )
-
-            choice = initial_completion.choices[0]
-            assistant_message = choice.message
-            messages = base_messages + [assistant_message.model_dump()]
+            if skip_planning:
+                # The tool arguments are fully determined here, so skip the planning
+                # round-trip and record an equivalent assistant tool call instead.
+                initial_completion = None
+                arguments = self._build_search_arguments({}, keyword, note_type, sort)
+                planned_calls = [("call_search_0", LLM_TOOL_NAME, arguments)]
+                messages = base_messages + [
+                    {
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": [
+                            {
+                                "id": "call_search_0",
+                                "type": "function",
+                                "function": {
+                                    "name": LLM_TOOL_NAME,
+                                    "arguments": json.dumps(arguments, ensure_ascii=False),
+                                },
+                            }
+                        ],
+                    }
+                ]
+            else:
+                initial_completion = await self._client.chat.completions.create(
+                    model=self._settings.deepseek_planning_model,
+                    temperature=0,
+                    messages=base_messages,
+                    tools=[tool_spec],
+                    tool_choice="auto",
+                )
 
-            tool_calls = assistant_message.tool_calls or []
-            if not tool_calls:
-                raise RuntimeError("DeepSeek did not attempt to call the Xiaohongshu search tool.")
+                choice = initial_completion.choices[0]
+                assistant_message = choice.message
+
+                tool_calls = assistant_message.tool_calls or []
+                if not tool_calls:
+                    raise RuntimeError("DeepSeek did not attempt to call the Xiaohongshu search tool.")
+                messages = base_messages + [self._minimal_assistant_turn(tool_calls)]
+
+                planned_calls = []
+                for call in tool_calls:
+                    arguments = {}
+                    if call.type == "function":
+                        if call.function.arguments:
+                            arguments = json.loads(call.function.arguments)
+                    planned_calls.append(
+                        (
+                            call.id,
+                            call.function.name if call.type == "function" else call.type,
+                            self._build_search_arguments(arguments, keyword, note_type, sort),
+                        )
+                    )
 
             tool_payloads: list[dict] = []
+            parsed_chunks: list[list[Any]] = []  # Decoded text chunks, parallel to tool_payloads
 
-            for call in tool_calls:
-                arguments = {}
-                if call.type == "function":
-                    if call.function.arguments:
-                        arguments = json.loads(call.function.arguments)
-
-                # Ensure keyword is set
-                arguments["keyword"] = keyword
-                
-                # Build filters object according to the actual tool schema
-                # The tool accepts: filters.note_type, filters.sort_by, etc.
-                filters = arguments.get("filters", {})
-                
-                # Map note_type (0=all, 1=video, 2=image+text) to tool's expected values
-                if note_type == 1:
-                    filters["note_type"] = "视频"
-                elif note_type == 2:
-                    filters["note_type"] = "图文"
-                else:
-                    filters["note_type"] = "不限"
-                
-                # Map sort parameter to tool's sort_by values
-                sort_map = {
-                    "general": "综合",
-                    "time_descending": "最新",
-                    "popularity_descending": "最多点赞",
-                }
-                filters["sort_by"] = sort_map.get(sort, "综合")
-                
-                # Only set filters if we have any filter values
-                if filters:
-                    arguments["filters"] = filters
-                
-                # Note: The tool doesn't support a "count" parameter directly
-                # The DeepSeek LLM might need to be instructed to limit results in its summary
-
+            for call_id, call_name, arguments in planned_calls:
                 result = await connection.group.call_tool(tool_name, arguments)
                 simplified = simplify_call_result(result)
                 
@@ -167,62 +297,75 @@ class AlphaPickSearchAgent:
                     logger.warning(f"MCP tool returned error: {error_text}")
                     # Still add to payloads in case there's partial data
                 
+                chunks = self._parse_text_chunks(simplified)
                 tool_payloads.append(simplified)
+                parsed_chunks.append(chunks)
                 
                 # After search, fetch full details for each note to get OCR and dates
                 # Extract note IDs and xsec_tokens from the search result
                 temp_notes = []  # List of (note_id, xsec_token) tuples
-                if "text" in simplified:
-                    for text_chunk in simplified["text"]:
-                        if isinstance(text_chunk, str):
-                            try:
-                                data = json.loads(text_chunk)
-                                if isinstance(data, dict) and "feeds" in data:
-                                    for feed in data["feeds"]:
-                                        note_id = feed.get("id") or feed.get("note_id")
-                                        xsec_token = feed.get("xsecToken") or feed.get("xsec_token")
-                                        if note_id and xsec_token:
-                                            temp_notes.append((note_id, xsec_token))
-                            except (json.JSONDecodeError, TypeError):
-                                pass
+                for data in chunks:
+                    if isinstance(data, dict) and "feeds" in data:
+                        for feed in data["feeds"]:
+                            note_id = feed.get("id") or feed.get("note_id")
+                            xsec_token = feed.get("xsecToken") or feed.get("xsec_token")
+                            if note_id and xsec_token:
+                                temp_notes.append((note_id, xsec_token))
                 
+                # Only the text chunks go back to the LLM; structured and binary
+                # content stays in tool_payloads for note extraction
+                llm_payload: dict[str, Any] = {"text": simplified.get("text", [])}
+                if simplified.get("is_error"):
+                    llm_payload["is_error"] = True
+                # Serialize the tool message off the event loop while the detail fetches are in flight
+                serialize = asyncio.to_thread(_dumps_compact, llm_payload)
+
                 # Fetch full details for each note
-                if temp_notes and "get_feed_detail" in tools:
-                    detail_tool_name = "get_feed_detail"
-                    for note_id, xsec_token in temp_notes[:count]:  # Limit to requested count
-                        try:
-                            detail_result = await connection.group.call_tool(
-                                detail_tool_name,
-                                {"feed_id": note_id, "xsec_token": xsec_token}
-                            )
-                            detail_simplified = simplify_call_result(detail_result)
-                            # Add detail to payloads for processing
-                            tool_payloads.append(detail_simplified)
-                        except Exception:
-                            # Skip if detail fetch fails
-                            pass
+                if temp_notes and DETAIL_TOOL_NAME in tools:
+                    tool_content, details = await asyncio.gather(
+                        serialize,
+                        self._fetch_note_details(connection, temp_notes[:count]),  # Limit to requested count
+                    )
+                    tool_payloads.extend(details)
+                    parsed_chunks.extend(self._parse_text_chunks(detail) for detail in details)
+                else:
+                    tool_content = await serialize
 
                 messages.append(
                     {
                         "role": "tool",
-                        "tool_call_id": call.id,
-                        "name": call.function.name if call.type == "function" else call.type,
-                        "content": json.dumps(simplified, ensure_ascii=False),
+                        "tool_call_id": call_id,
+                        "name": call_name,
+                        "content": tool_content,
                     }
                 )
 
-            final_completion = await self._client.chat.completions.create(
-                model=self._settings.deepseek_model,
-                temperature=0,
-                messages=messages,
-            )
-
-            summary_message = final_completion.choices[0].message
-            summary_text = (summary_message.content or "").strip()
+            if summarize:
+                final_completion = await self._client.chat.completions.create(
+                    model=self._settings.deepseek_model,
+                    temperature=0,
+                    messages=messages,
+                )
+                summary_message = final_completion.choices[0].message
+                summary_text = (summary_message.content or "").strip()
+                summary_usage = _usage_dict(final_completion.usage)
+                conversation_log = messages + [summary_message.model_dump(exclude_none=True)]
+            else:
+                summary_text = ""
+                summary_usage = None
+                conversation_log = messages
 
             # Extract raw notes from tool payloads
             raw_notes: List[Dict[str, Any]] = []
-            for payload in tool_payloads:
+            # First note seen per note_id, so details merge in O(1) instead of a scan
+            notes_by_id: Dict[Any, Dict[str, Any]] = {}
+
+            def _add_notes(notes: Iterable[Dict[str, Any]]) -> None:
+                for note in notes:
+                    raw_notes.append(note)
+                    notes_by_id.setdefault(note.get("note_id"), note)
+
+            for payload, chunks in zip(tool_payloads, parsed_chunks):
                 # The payload structure from simplify_call_result contains:
                 # - text: list of text chunks (often JSON strings)
                 # - structured_content: structured data
@@ -232,42 +375,34 @@ class AlphaPickSearchAgent:
                 if "structured_content" in payload and payload["structured_content"]:
                     structured = payload["structured_content"]
                     # Recursively find note-like dictionaries
-                    raw_notes.extend(self._extract_notes_from_payload(structured))
+                    _add_notes(self._extract_notes_from_payload(structured))
                 
-                # Parse JSON from text chunks (the tool returns JSON strings)
-                if "text" in payload:
-                    for text_chunk in payload["text"]:
-                        if isinstance(text_chunk, str):
-                            try:
-                                # Try parsing as JSON
-                                data = json.loads(text_chunk)
-                                # Handle the "feeds" structure returned by search
-                                if isinstance(data, dict) and "feeds" in data:
-                                    for feed in data["feeds"]:
-                                        # Convert feed structure to note structure
-                                        note = self._convert_feed_to_note(feed)
-                                        if note:
-                                            raw_notes.append(note)
-                                # Handle detailed note structure from get_feed_detail
-                                elif isinstance(data, dict) and ("note_detail" in data or "note_id" in data or "id" in data):
-                                    # This is a detailed note from get_feed_detail
-                                    note = self._convert_detail_to_note(data)
-                                    if note:
-                                        # Merge with existing note if we have a basic version
-                                        existing_idx = None
-                                        for idx, existing_note in enumerate(raw_notes):
-                                            if existing_note.get("note_id") == note.get("note_id"):
-                                                existing_idx = idx
-                                                break
-                                        if existing_idx is not None:
-                                            # Merge details into existing note
-                                            raw_notes[existing_idx].update(note)
-                                        else:
-                                            raw_notes.append(note)
+                # Use the JSON text chunks decoded when the payload arrived
+                for data in chunks:
+                    try:
+                        # Handle the "feeds" structure returned by search
+                        if isinstance(data, dict) and "feeds" in data:
+                            for feed in data["feeds"]:
+                                # Convert feed structure to note structure
+                                note = self._convert_feed_to_note(feed)
+                                if note:
+                                    _add_notes((note,))
+                        # Handle detailed note structure from get_feed_detail
+                        elif isinstance(data, dict) and ("note_detail" in data or "note_id" in data or "id" in data):
+                            # This is a detailed note from get_feed_detail
+                            note = self._convert_detail_to_note(data)
+                            if note:
+                                # Merge with existing note if we have a basic version
+                                existing_note = notes_by_id.get(note.get("note_id"))
+                                if existing_note is not None:
+                                    # Merge details into existing note
+                                    existing_note.update(note)
                                 else:
-                                    raw_notes.extend(self._extract_notes_from_payload(data))
-                            except (json.JSONDecodeError, TypeError):
-                                pass
+                                    _add_notes((note,))
+                        else:
+                            _add_notes(self._extract_notes_from_payload(data))
+                    except TypeError:
+                        pass
 
             # Process notes: filter by date, extract OCR, quality check
             processed_notes, target_date = process_notes(
@@ -279,12 +414,10 @@ class AlphaPickSearchAgent:
             )
 
             usage = {
-                "initial": initial_completion.usage.model_dump() if initial_completion.usage else None,
-                "summary": final_completion.usage.model_dump() if final_completion.usage else None,
+                "initial": _usage_dict(initial_completion.usage) if initial_completion is not None else None,
+                "summary": summary_usage,
             }
 
-            conversation_log = messages + [summary_message.model_dump()]
-
             # Determine scan mode
             scan_mode = "today" if filter_today else ("latest" if filter_latest_date else "range")
             
@@ -301,27 +434,196 @@ class AlphaPickSearchAgent:
                 llm_messages=conversation_log,
             )
 
+    async def search_keywords_batch(
+        self,
+        keywords: Iterable[str],
+        *,
+        poll_interval: float = BATCH_POLL_INTERVAL,
+        **search_kwargs: Any,
+    ) -> List[SearchOutcome]:
+        """Search several keywords and summarize them through the Batch API.
+
+        The MCP searches run right away over one shared connection; the summary
+        completions are submitted together as a single ``/v1/chat/completions``
+        batch job (discounted, 24h completion window) and this coroutine polls
+        until it finishes. Requires an endpoint that implements the Batch API.
+        """
+        session = nullcontext(self) if self._session_state is not None else self
+        async with session:
+            outcomes = [
+                await self.search_keyword(keyword, summarize=False, **search_kwargs)
+                for keyword in dict.fromkeys(keywords)
+            ]
+        if not outcomes:
+            return outcomes
+
+        requests = "".join(
+            json.dumps(
+                {
+                    "custom_id": outcome.keyword,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self._settings.deepseek_model,
+                        "temperature": 0,
+                        "messages": outcome.llm_messages,
+                    },
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+            for outcome in outcomes
+        )
+        batch_file = await self._client.files.create(
+            file=("alpha_picks_summaries.jsonl", requests.encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await self._client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self._client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Summary batch {batch.id} ended with status {batch.status!r}.")
+
+        by_keyword = {outcome.keyword: outcome for outcome in outcomes}
+        output = await self._client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            outcome = by_keyword.get(record.get("custom_id"))
+            body = (record.get("response") or {}).get("body") or {}
+            if outcome is None or not body.get("choices"):
+                continue
+            summary_message = body["choices"][0]["message"]
+            outcome.summary = (summary_message.get("content") or "").strip()
+            outcome.llm_messages = outcome.llm_messages + [summary_message]
+            if outcome.llm_usage is not None:
+                outcome.llm_usage["summary"] = body.get("usage")
+        return outcomes
+
+    @staticmethod
+    def _minimal_assistant_turn(tool_calls: List[Any]) -> Dict[str, Any]:
+        """Keep only the tool calls of a planning reply, dropping any rationale text."""
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": call.id,
+                    "type": call.type,
+                    "function": {"name": call.function.name, "arguments": call.function.arguments},
+                }
+                if call.type == "function"
+                else call.model_dump(exclude_none=True)
+                for call in tool_calls
+            ],
+        }
+
+    @staticmethod
+    def _build_search_arguments(
+        arguments: Dict[str, Any], keyword: str, note_type: int, sort: str
+    ) -> Dict[str, Any]:
+        """Fill in the keyword and filters the search tool expects."""
+        # Ensure keyword is set
+        arguments["keyword"] = keyword
+        
+        # Build filters object according to the actual tool schema
+        # The tool accepts: filters.note_type, filters.sort_by, etc.
+        filters = arguments.get("filters", {})
+        
+        # Map note_type and sort onto the tool's filter values
+        filters["note_type"] = _NOTE_TYPE_MAP.get(note_type, "不限")
+        filters["sort_by"] = _SORT_MAP.get(sort, "综合")
+        arguments["filters"] = filters
+        
+        # Note: The tool doesn't support a "count" parameter directly
+        # The DeepSeek LLM might need to be instructed to limit results in its summary
+        return arguments
+
+    @staticmethod
+    def _parse_text_chunks(payload: Dict[str, Any]) -> List[Any]:
+        """Decode each JSON text chunk of a simplified tool payload, skipping non-JSON text."""
+        parsed: List[Any] = []
+        for text_chunk in payload.get("text", ()):
+            if isinstance(text_chunk, str):
+                try:
+                    parsed.append(_loads(text_chunk))
+                except (json.JSONDecodeError, TypeError):
+                    pass
+        return parsed
+
+    async def _fetch_note_details(
+        self, connection: MCPConnection, notes: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Fetch ``get_feed_detail`` for each (note_id, xsec_token) pair concurrently.
+
+        Details already fetched by this agent are served from its LRU cache.
+        """
+        cache = self._detail_cache
+        cached: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for key in notes:
+            if key in cache:
+                cache.move_to_end(key)
+                cached[key] = cache[key]
+        missing = [key for key in notes if key not in cached]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DETAIL_FETCHES)
+
+        async def _fetch(note_id: str, xsec_token: str) -> Any:
+            async with semaphore:
+                return await connection.group.call_tool(
+                    DETAIL_TOOL_NAME,
+                    {"feed_id": note_id, "xsec_token": xsec_token},
+                )
+
+        results = await asyncio.gather(
+            *(_fetch(note_id, xsec_token) for note_id, xsec_token in missing),
+            return_exceptions=True,
+        )
+        fetched: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for key, result in zip(missing, results):
+            if isinstance(result, Exception):
+                continue  # Skip details whose fetch failed
+            fetched[key] = simplified = simplify_call_result(result)
+            if not simplified.get("is_error"):
+                cache[key] = simplified
+                if len(cache) > DETAIL_CACHE_SIZE:
+                    cache.popitem(last=False)
+
+        # Keep the successful details in request order
+        details: List[Dict[str, Any]] = []
+        for key in notes:
+            payload = cached.get(key) or fetched.get(key)
+            if payload is not None:
+                details.append(payload)
+        return details
+
     def _extract_notes_from_payload(self, data: Any) -> List[Dict[str, Any]]:
-        """Recursively extract note dictionaries from payload."""
+        """Extract note dictionaries from payload with an explicit depth-first stack."""
         notes: List[Dict[str, Any]] = []
+        stack: List[Any] = [data]
         
-        if isinstance(data, dict):
-            # Check if this dict looks like a note
-            if "note_id" in data or "id" in data or "noteId" in data:
-                notes.append(data)
-            # Handle feeds structure
-            elif "feeds" in data:
-                for feed in data.get("feeds", []):
-                    note = self._convert_feed_to_note(feed)
-                    if note:
-                        notes.append(note)
-            else:
-                # Recursively search nested structures
-                for value in data.values():
-                    notes.extend(self._extract_notes_from_payload(value))
-        elif isinstance(data, list):
-            for item in data:
-                notes.extend(self._extract_notes_from_payload(item))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                # Check if this dict looks like a note
+                if "note_id" in node or "id" in node or "noteId" in node:
+                    notes.append(node)
+                # Handle feeds structure
+                elif "feeds" in node:
+                    for feed in node.get("feeds", []):
+                        note = self._convert_feed_to_note(feed)
+                        if note:
+                            notes.append(note)
+                else:
+                    # Search nested structures; push reversed to keep document order
+                    stack.extend(reversed(node.values()))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
         
         return notes
 
@@ -330,35 +632,33 @@ class AlphaPickSearchAgent:
         if not isinstance(feed, dict):
             return None
         
-        note: Dict[str, Any] = {}
-        note["note_id"] = feed.get("id") or feed.get("note_id") or feed.get("noteId", "")
-        
-        if not note["note_id"]:
+        note_id = _first_of(feed, _NOTE_ID_KEYS, "")
+        if not note_id:
             return None
         
-        # Extract from noteCard structure
+        # Build the note in one dict display so it is sized once, not grown key by key
         note_card = feed.get("noteCard", {})
-        note["title"] = note_card.get("displayTitle") or note_card.get("title")
-        note["type"] = note_card.get("type", "normal")
-        
-        # Extract user info
         user = note_card.get("user", {})
-        note["user_nickname"] = user.get("nickname") or user.get("nickName")
-        note["user_id"] = user.get("userId")
-        
-        # Extract interaction info
         interact_info = note_card.get("interactInfo", {})
-        note["liked_count"] = interact_info.get("likedCount", "0")
-        note["comment_count"] = interact_info.get("commentCount", "0")
-        note["shared_count"] = interact_info.get("sharedCount", "0")
-        
-        # Extract cover/image info
         cover = note_card.get("cover", {})
-        note["cover_url"] = cover.get("urlDefault") or cover.get("url")
-        
-        # Extract other fields
-        note["model_type"] = feed.get("modelType")
-        note["xsec_token"] = feed.get("xsecToken")
+        note: Dict[str, Any] = {
+            "note_id": note_id,
+            # Extract from noteCard structure
+            "title": _first_of(note_card, ("displayTitle", "title")),
+            "type": note_card.get("type", "normal"),
+            # Extract user info
+            "user_nickname": _first_of(user, _NICKNAME_KEYS),
+            "user_id": user.get("userId"),
+            # Extract interaction info
+            "liked_count": interact_info.get("likedCount", "0"),
+            "comment_count": interact_info.get("commentCount", "0"),
+            "shared_count": interact_info.get("sharedCount", "0"),
+            # Extract cover/image info
+            "cover_url": _first_of(cover, ("urlDefault", "url")),
+            # Extract other fields
+            "model_type": feed.get("modelType"),
+            "xsec_token": feed.get("xsecToken"),
+        }
         
         # Try to extract time/date
         time_info = feed.get("time") or note_card.get("time") or feed.get("timestamp")
@@ -379,11 +679,8 @@ class AlphaPickSearchAgent:
         
         # Extract note_id from various possible locations
         note["note_id"] = (
-            detail.get("note_id") or 
-            detail.get("id") or 
-            detail.get("noteId") or
-            (detail.get("note_detail", {}) or {}).get("note_id") or
-            (detail.get("note_detail", {}) or {}).get("id") or
+            _first_of(detail, _DETAIL_NOTE_ID_KEYS) or
+            _first_of(detail.get("note_detail", {}) or {}, ("note_id", "id")) or
             ""
         )
         
@@ -396,32 +693,16 @@ class AlphaPickSearchAgent:
             note_detail = detail
         
         # Extract title and description
-        note["title"] = (
-            note_detail.get("title") or 
-            note_detail.get("display_title") or
-            note_detail.get("displayTitle") or
-            note_detail.get("note_title")
-        )
-        note["description"] = (
-            note_detail.get("desc") or
-            note_detail.get("description") or
-            note_detail.get("note_desc") or
-            note_detail.get("content")
-        )
+        for out_key, keys in _DETAIL_TEXT_FIELDS:
+            note[out_key] = _first_of(note_detail, keys)
         
         # Extract user info
         user = note_detail.get("user", {})
-        note["user_nickname"] = user.get("nickname") or user.get("nickName")
-        note["user_id"] = user.get("userId") or user.get("user_id")
+        note["user_nickname"] = _first_of(user, _NICKNAME_KEYS)
+        note["user_id"] = _first_of(user, ("userId", "user_id"))
         
         # Extract time/date
-        time_info = (
-            note_detail.get("time") or 
-            note_detail.get("timestamp") or
-            note_detail.get("create_time") or
-            note_detail.get("publish_time") or
-            note_detail.get("created_at")
-        )
+        time_info = _first_of(note_detail, _DETAIL_TIME_KEYS)
         if time_info:
             note["time"] = time_info
         
@@ -453,18 +734,12 @@ class AlphaPickSearchAgent:
             note["ocr_text"] = "\n\n".join(image_texts)
         
         # Extract URL
-        note["url"] = (
-            note_detail.get("url") or
-            note_detail.get("note_url") or
-            note_detail.get("share_link") or
-            note_detail.get("link")
-        )
+        note["url"] = _first_of(note_detail, _DETAIL_URL_KEYS)
         
         # Extract interaction info
         interact_info = note_detail.get("interact_info", note_detail.get("interactInfo", {}))
-        note["liked_count"] = interact_info.get("liked_count") or interact_info.get("likedCount", "0")
-        note["comment_count"] = interact_info.get("comment_count") or interact_info.get("commentCount", "0")
-        note["shared_count"] = interact_info.get("shared_count") or interact_info.get("sharedCount", "0")
+        for out_key, keys in _DETAIL_INTERACT_FIELDS:
+            note[out_key] = _first_of(interact_info, keys, "0")
         
         # Copy all raw data
         note["raw"] = detail
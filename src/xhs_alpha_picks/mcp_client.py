@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
+import random
+import time
+import weakref
 from typing import AsyncIterator, Dict, Iterable, List, Tuple
 
 from mcp.client.session_group import (
@@ -12,6 +17,11 @@ from mcp.client.session_group import (
 )
 import mcp.types as types
 
+try:  # pragma: no cover - optional dependency
+    from rapidfuzz import fuzz, process as fuzz_process, utils as fuzz_utils
+except ImportError:  # pragma: no cover - optional dependency
+    fuzz = fuzz_process = fuzz_utils = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +36,15 @@ class MCPToolNotFound(RuntimeError):
 _LOG_FALLBACK_MESSAGE = (
     "Failed connecting to MCP server candidate '%s' using %s parameters: %s"
 )
+_CONNECT_STAGGER = 0.25  # Seconds between starting successive candidate attempts
+_MAX_CONCURRENT_CONNECTS = 3  # Candidate handshakes allowed in flight at once
+_BACKOFF = (0.1, 0.2, 0.4)  # Jittered delay ceilings (seconds) before retrying a failing URL
+_CIRCUIT_THRESHOLD = 3  # Consecutive failures before a URL is skipped
+_CIRCUIT_COOLDOWN = 30.0  # Seconds a tripped URL stays skipped
+_FUZZY_TOOL_QUERY = "search notes xiaohongshu 搜索 笔记"
+_FUZZY_TOOL_SCORE_CUTOFF = 60  # Minimum rapidfuzz token_set_ratio for a fuzzy tool match
+# url -> (consecutive failures, monotonic time until which the URL is skipped)
+_CIRCUIT: Dict[str, Tuple[int, float]] = {}
 
 
 @dataclass(slots=True)
@@ -51,65 +70,243 @@ def _server_params_for(url: str):
     return SseServerParameters(url=url)
 
 
+def _circuit_open(url: str) -> bool:
+    """Whether ``url`` failed too often recently and should be skipped."""
+    return _CIRCUIT.get(url, (0, 0.0))[1] > time.monotonic()
+
+
+def _record_failure(url: str) -> None:
+    """Count a failed attempt and trip the circuit after ``_CIRCUIT_THRESHOLD`` in a row."""
+    failures = _CIRCUIT.get(url, (0, 0.0))[0] + 1
+    open_until = time.monotonic() + _CIRCUIT_COOLDOWN if failures >= _CIRCUIT_THRESHOLD else 0.0
+    _CIRCUIT[url] = (failures, open_until)
+
+
+def _backoff_delay(url: str) -> float:
+    """Full-jitter exponential backoff based on the URL's recent failure count."""
+    failures = _CIRCUIT.get(url, (0, 0.0))[0]
+    return random.uniform(0, _BACKOFF[min(failures, len(_BACKOFF) - 1)])
+
+
+async def _open_candidate(group: ClientSessionGroup, candidate: str) -> types.ClientSession:
+    """Connect ``group`` to ``candidate``, falling back from Streamable HTTP to SSE."""
+    # Try primary transport method first
+    params = _server_params_for(candidate)
+    try:
+        session = await group.connect_to_server(params)
+    except Exception as first_exc:  # noqa: BLE001
+        if not isinstance(params, StreamableHttpParameters):
+            raise
+        # If StreamableHttpParameters failed, try SSE as fallback after a jittered pause
+        logger.debug("Streamable HTTP failed for %s, trying SSE: %s", candidate, first_exc)
+        await asyncio.sleep(_backoff_delay(candidate))
+        try:
+            session = await group.connect_to_server(SseServerParameters(url=candidate))
+        except Exception:  # noqa: BLE001
+            # Both transport methods failed; report the primary transport's error
+            raise first_exc
+        logger.info("Connected to MCP server via %s using SSE (fallback)", candidate)
+        return session
+    logger.info("Connected to MCP server via %s using %s", candidate, type(params).__name__)
+    return session
+
+
+async def _hold_candidate(
+    index: int,
+    candidate: str,
+    semaphore: asyncio.Semaphore,
+    results: asyncio.Queue,
+    release: asyncio.Event,
+) -> None:
+    """Connect to one candidate in its own task and keep the session open until released.
+
+    The transports enter anyio cancel scopes that must be exited by the task
+    that entered them, so each attempt owns its ClientSessionGroup for its
+    whole lifetime and reports ``(url, group, session, error)`` on ``results``.
+    """
+    # Happy Eyeballs (RFC 8305): stagger starts so earlier candidates keep priority
+    await asyncio.sleep(index * _CONNECT_STAGGER)
+    reported = False
+    try:
+        async with ClientSessionGroup() as group:
+            async with semaphore:
+                session = await _open_candidate(group, candidate)
+            results.put_nowait((candidate, group, session, None))
+            reported = True
+            await release.wait()
+    except Exception as exc:  # noqa: BLE001
+        if not reported:
+            reported = True
+            results.put_nowait((candidate, None, None, exc))
+    finally:
+        if not reported:
+            # A failing transport can cancel this task from its own task group
+            results.put_nowait(
+                (candidate, None, None, MCPConnectionError(f"Connection attempt to {candidate} was cancelled"))
+            )
+
+
+async def _race_candidates(
+    urls: Iterable[str],
+) -> Tuple[MCPConnection, asyncio.Event, asyncio.Task]:
+    """Connect to the first candidate that answers.
+
+    Returns the winning connection plus the ``release`` event and the task
+    holding the session open; pass both to ``_release_candidates`` to close it.
+    """
+
+    candidates = list(dict.fromkeys(urls))
+    skipped = [url for url in candidates if _circuit_open(url)]
+    if skipped and len(skipped) == len(candidates):
+        raise MCPConnectionError(
+            f"Unable to connect to MCP server; circuit open for {skipped}"
+        )
+    if skipped:
+        logger.debug("Skipping MCP candidates with an open circuit: %s", skipped)
+        candidates = [url for url in candidates if url not in skipped]
+
+    errors: list[tuple[str, Exception]] = []
+    results: asyncio.Queue = asyncio.Queue()
+    release = asyncio.Event()
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_CONNECTS)
+    attempts = {
+        candidate: asyncio.create_task(_hold_candidate(index, candidate, semaphore, results, release))
+        for index, candidate in enumerate(candidates)
+    }
+
+    try:
+        for _ in range(len(attempts)):
+            candidate, group, session, error = await results.get()
+            if error is None:
+                _CIRCUIT.pop(candidate, None)
+                # Drop the slower attempts; their tasks close any half-opened sessions
+                losers = [task for other, task in attempts.items() if other != candidate]
+                for task in losers:
+                    task.cancel()
+                await asyncio.gather(*losers, return_exceptions=True)
+                connection = MCPConnection(group=group, session=session, connected_url=candidate)
+                return connection, release, attempts[candidate]
+            errors.append((candidate, error))
+            _record_failure(candidate)
+            logger.debug(_LOG_FALLBACK_MESSAGE, candidate, type(error).__name__, error)
+    except BaseException:
+        await _release_candidates(release, None, attempts.values())
+        raise
+
+    await _release_candidates(release, None, attempts.values())
+    detail = {
+        "attempted_urls": [url for url, _ in errors],
+        "error_chain": [f"{url}: {error}" for url, error in errors],
+    }
+    raise MCPConnectionError(
+        f"Unable to connect to MCP server; attempts failed for {detail['attempted_urls']}"
+    )
+
+
+async def _release_candidates(
+    release: asyncio.Event,
+    winner: asyncio.Task | None,
+    attempts: Iterable[asyncio.Task],
+) -> None:
+    """Let the winning attempt close its session group and cancel the rest."""
+    release.set()
+    losers = [task for task in attempts if task is not winner]
+    for task in losers:
+        task.cancel()
+    await asyncio.gather(*losers, *([winner] if winner else []), return_exceptions=True)
+
+
 @asynccontextmanager
 async def connect_via_candidates(
     urls: Iterable[str],
 ) -> AsyncIterator[MCPConnection]:
-    """Try connecting to the MCP server using known URL candidates."""
+    """Connect to the first MCP server URL candidate that answers.
 
-    errors: list[tuple[str, Exception]] = []
+    Candidates are attempted concurrently (staggered, at most
+    ``_MAX_CONCURRENT_CONNECTS`` handshakes at a time); the first session
+    established wins and the other attempts are cancelled.
+    """
 
-    async with ClientSessionGroup() as group:
-        session = None
-        connected_url = None
-
-        for candidate in urls:
-            # Try primary transport method first
-            params = _server_params_for(candidate)
-            try:
-                session = await group.connect_to_server(params)
-                connected_url = candidate
-                logger.info("Connected to MCP server via %s using %s", candidate, type(params).__name__)
-                break
-            except Exception as first_exc:  # noqa: BLE001
-                # If StreamableHttpParameters failed, try SSE as fallback
-                if isinstance(params, StreamableHttpParameters):
-                    logger.debug("Streamable HTTP failed for %s, trying SSE: %s", candidate, first_exc)
-                    try:
-                        sse_params = SseServerParameters(url=candidate)
-                        session = await group.connect_to_server(sse_params)
-                        connected_url = candidate
-                        logger.info("Connected to MCP server via %s using SSE (fallback)", candidate)
-                        break
-                    except Exception as sse_exc:  # noqa: BLE001
-                        # Both transport methods failed for this candidate
-                        errors.append((candidate, first_exc))
-                        logger.debug(_LOG_FALLBACK_MESSAGE, candidate, type(first_exc).__name__, first_exc)
-                else:
-                    # Already tried SSE, just record the error
-                    errors.append((candidate, first_exc))
-                    logger.debug(_LOG_FALLBACK_MESSAGE, candidate, type(first_exc).__name__, first_exc)
-
-        if session is None or connected_url is None:
-            detail = {
-                "attempted_urls": [url for url, _ in errors],
-                "error_chain": [f"{url}: {error}" for url, error in errors],
-            }
-            raise MCPConnectionError(
-                f"Unable to connect to MCP server; attempts failed for {detail['attempted_urls']}"
-            )
+    connection, release, holder = await _race_candidates(urls)
+    try:
+        yield connection
+    finally:
+        await _release_candidates(release, holder, ())
+        logger.debug("MCP connection to %s closed", connection.connected_url)
 
-        try:
-            yield MCPConnection(group=group, session=session, connected_url=connected_url)
-        finally:
-            # Context manager closes connections automatically.
-            logger.debug("MCP connection to %s closed", connected_url)
 
+@dataclass(slots=True)
+class _PooledConnection:
+    """A warm connection kept in ``_POOL`` together with the task holding it open."""
+
+    connection: MCPConnection
+    release: asyncio.Event
+    holder: asyncio.Task
+    loop: asyncio.AbstractEventLoop
 
-def locate_search_notes_tool(
-    tools: Dict[str, types.Tool],
-) -> Tuple[str, types.Tool]:
-    """Find the Xiaohongshu note search MCP tool."""
+
+_POOL: Dict[Tuple[str, ...], _PooledConnection] = {}
+# One lock per event loop serialises pool lookup/race/insert, so concurrent
+# callers share a single race instead of orphaning each other's sessions
+_POOL_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+_POOL_HEALTH_TIMEOUT = 2.0  # Seconds allowed for the list_tools liveness probe
+
+
+async def _is_alive(entry: _PooledConnection) -> bool:
+    """Check a pooled session still answers before handing it out again."""
+    if entry.loop is not asyncio.get_running_loop() or entry.holder.done():
+        return False
+    try:
+        await asyncio.wait_for(entry.connection.session.list_tools(), _POOL_HEALTH_TIMEOUT)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Pooled MCP connection to %s is stale: %s", entry.connection.connected_url, exc)
+        return False
+    return True
+
+
+@asynccontextmanager
+async def pooled_connection(
+    urls: Iterable[str],
+) -> AsyncIterator[MCPConnection]:
+    """Like ``connect_via_candidates`` but keep the session open for later calls.
+
+    Connections are pooled per candidate list and health-checked before reuse;
+    a stale entry is closed and re-established. Call ``close_pool`` to shut
+    them down (pending holders are also cancelled when the event loop ends).
+    """
+
+    key = tuple(dict.fromkeys(urls))
+    loop = asyncio.get_running_loop()
+    lock = _POOL_LOCKS.get(loop)
+    if lock is None:
+        lock = _POOL_LOCKS[loop] = asyncio.Lock()
+    async with lock:
+        entry = _POOL.get(key)
+        if entry is not None and not await _is_alive(entry):
+            _POOL.pop(key, None)
+            if entry.loop is loop:
+                await _release_candidates(entry.release, entry.holder, ())
+            entry = None
+        if entry is None:
+            connection, release, holder = await _race_candidates(key)
+            entry = _POOL[key] = _PooledConnection(connection, release, holder, loop)
+    yield entry.connection
+
+
+async def close_pool() -> None:
+    """Close every pooled MCP connection opened on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key, entry in list(_POOL.items()):
+        del _POOL[key]
+        if entry.loop is loop:
+            await _release_candidates(entry.release, entry.holder, ())
+
+
+@lru_cache(maxsize=16)
+def _locate_search_tool_name(entries: Tuple[Tuple[str, str], ...]) -> str | None:
+    """Pick the search tool from ``(name, description)`` pairs; cached per tool listing."""
 
     keywords = ("search", "note")
     
@@ -121,23 +318,49 @@ def locate_search_notes_tool(
         "xhs",     # Service abbreviation
     ]
 
-    for tool_name, tool in tools.items():
+    for tool_name, description in entries:
         name_lower = tool_name.lower()
-        description_lower = (tool.description or "").lower()
+        description_lower = description.lower()
 
         # Check if name contains both keywords
         if all(keyword in name_lower for keyword in keywords):
-            return tool_name, tool
+            return tool_name
 
         # Check for Chinese keywords
         if "搜索" in description_lower and "笔记" in description_lower:
-            return tool_name, tool
+            return tool_name
         
         # Check if name contains any of the patterns
         if any(pattern in name_lower for pattern in tool_patterns):
             # Additional check: if description suggests it's a search tool
             if any(word in description_lower for word in ["search", "查找", "搜索", "query", "查询"]):
-                return tool_name, tool
+                return tool_name
+
+    # Nothing matched the heuristics; accept a close fuzzy match (e.g. "searchNotes")
+    if fuzz_process is not None and entries:
+        match = fuzz_process.extractOne(
+            _FUZZY_TOOL_QUERY,
+            {tool_name: f"{tool_name} {description}" for tool_name, description in entries},
+            scorer=fuzz.token_set_ratio,
+            processor=fuzz_utils.default_process,
+            score_cutoff=_FUZZY_TOOL_SCORE_CUTOFF,
+        )
+        if match is not None:
+            return match[2]
+
+    return None
+
+
+def locate_search_notes_tool(
+    tools: Dict[str, types.Tool],
+) -> Tuple[str, types.Tool]:
+    """Find the Xiaohongshu note search MCP tool."""
+
+    tool_name = _locate_search_tool_name(
+        tuple((name, tool.description or "") for name, tool in tools.items())
+    )
+    if tool_name is not None:
+        return tool_name, tools[tool_name]
 
     # If no match found, raise error with available tools
     available_tools = list(tools.keys())
@@ -161,11 +384,10 @@ def simplify_call_result(result: types.CallToolResult) -> dict:
     other_content: list[dict] = []
 
     for item in result.content:
-        match item:
-            case types.TextContent(text=text):
-                text_chunks.append(text)
-            case _:
-                other_content.append(item.model_dump())
+        if isinstance(item, types.TextContent):
+            text_chunks.append(item.text)
+        else:
+            other_content.append(item.model_dump())
 
     if text_chunks:
         payload["text"] = text_chunks
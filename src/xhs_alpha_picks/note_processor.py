@@ -2,13 +2,70 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import heapq
 import re
 
-
-@dataclass
+# Optional text fields exported by ProcessedNote.to_dict, in output order.
+_TEXT_EXPORT_FIELDS = (
+    "title",
+    "post_text",
+    "ocr_text",
+    "author",
+    "url",
+    "selection_date",
+    "publish_time",
+)
+_get_text_export_fields = attrgetter(*_TEXT_EXPORT_FIELDS)
+
+# Patterns used per note by check_alpha_picks_quality / process_notes, compiled once.
+# Selection patterns fused into one scan. Each alternative sits in a lookahead so
+# overlapping hits (e.g. "3个" inside "第3个") are still seen, as with separate scans.
+_SELECTION_RE = re.compile(
+    r"(?=(?P<num_sym>\d+[\.\)]\s*[A-Z]{2,5}))"  # "1. AAPL", "2) TSLA"
+    r"|(?=(?P<sym_pair>[A-Z]{2,5}[\s,]+[A-Z]{2,5}))"  # "AAPL TSLA", "AAPL, TSLA"
+    r"|(?=(?P<zh_ord>第[一二三四五六七八九十\d]+[只个股个]))"  # Chinese: "第一只", "第3个"
+    r"|(?=(?P<zh_count>\d+)[个只支项])"  # Chinese: "3个", "5只"
+)
+# Stock symbols contained in each symbol-style selection match: "1. AAPL" holds one,
+# "AAPL TSLA" two, "第一只" none; "3个" style matches carry their count instead.
+_SYMBOLS_PER_SELECTION = {"num_sym": 1, "sym_pair": 2, "zh_ord": 0}
+# Any date-like text, as one alternation so the scan stops at the first hit
+_HAS_DATE_RE = re.compile(
+    r"\d{4}[-/]\d{2}[-/]\d{2}"  # YYYY-MM-DD
+    r"|\d{2}[-/]\d{2}[-/]\d{4}"  # MM-DD-YYYY
+    r"|\d{4}\.\d{2}\.\d{2}"  # YYYY.MM.DD
+    r"|\d{1,2}[月/]\d{1,2}日"  # Chinese: "1月1日"
+)
+_DATE_EXTRACT_RE = re.compile(r"(\d{4}[-/]\d{2}[-/]\d{2})")
+_NOTE_DATE_KEYS = (
+    "time",
+    "timestamp",
+    "publish_time",
+    "create_time",
+    "update_time",
+    "date",
+    "publish_date",
+    "created_at",
+    "updated_at",
+)
+# Replaces a strptime loop over "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"
+# Accepts what strptime took for "%Y-%m-%d" with an optional "T%H:%M:%S" or
+# " %H:%M:%S" tail: unpadded/space-padded fields, any whitespace separator.
+_ISO_DATETIME_RE = re.compile(
+    r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+    r"(?:(?:T|\s+)(2[0-3]|[01]\d|\d):([0-5]\d|\d):(6[01]|[0-5]\d|\d))?",
+    re.IGNORECASE,
+)
+_OCR_KEYS = ("ocr", "image_text", "img_text")  # Key substrings that mark OCR text
+# "seeking alpha", "seekingalpha", "alpha pick(s)" in one pass over lowercased text
+_ALPHA_RE = re.compile(r"seeking ?alpha|alpha pick")
+
+
+@dataclass(slots=True)
 class ProcessedNote:
     """A processed note with extracted text, quality check, and metadata."""
 
@@ -27,37 +84,19 @@ class ProcessedNote:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON/CSV export."""
-        result = {
-            "note_id": self.note_id,
-            "title": self.title or "",
-            "post_text": self.post_text or "",
-            "ocr_text": self.ocr_text or "",
-            "author": self.author or "",
-            "url": self.url or "",
-            "selection_date": self.selection_date or "",
-            "publish_time": self.publish_time or "",
-            "is_high_quality": self.is_high_quality,
-            "quality_score": self.quality_score,
-            "quality_notes": "; ".join(self.quality_notes),
-        }
+        result: Dict[str, Any] = {"note_id": self.note_id}
+        result.update(
+            zip(_TEXT_EXPORT_FIELDS, [value or "" for value in _get_text_export_fields(self)])
+        )
+        result["is_high_quality"] = self.is_high_quality
+        result["quality_score"] = self.quality_score
+        result["quality_notes"] = "; ".join(self.quality_notes)
         return result
 
 
 def extract_date_from_note(note: Dict[str, Any]) -> Optional[datetime]:
     """Extract publish/update date from note dictionary."""
-    date_keys = [
-        "time",
-        "timestamp",
-        "publish_time",
-        "create_time",
-        "update_time",
-        "date",
-        "publish_date",
-        "created_at",
-        "updated_at",
-    ]
-
-    for key in date_keys:
+    for key in _NOTE_DATE_KEYS:
         value = note.get(key)
         if not value:
             continue
@@ -73,16 +112,14 @@ def extract_date_from_note(note: Dict[str, Any]) -> Optional[datetime]:
             except (ValueError, OSError):
                 continue
 
-        # Try parsing as ISO string
+        # Try parsing as ISO string ("YYYY-MM-DD", optionally "THH:MM:SS" or " HH:MM:SS")
         if isinstance(value, str):
+            match = _ISO_DATETIME_RE.fullmatch(value[:19])
+            if match is None:
+                continue
             try:
-                # Try common ISO formats
-                for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
-                    try:
-                        return datetime.strptime(value[:19], fmt)
-                    except ValueError:
-                        continue
-            except Exception:
+                return datetime(*map(int, filter(None, match.groups())))
+            except ValueError:  # e.g. month 13
                 continue
 
     return None
@@ -90,36 +127,44 @@ def extract_date_from_note(note: Dict[str, Any]) -> Optional[datetime]:
 
 def extract_ocr_text(note: Dict[str, Any]) -> str:
     """Extract all OCR text from images in the note."""
+    return "\n\n".join(_collect_ocr_texts(note))
+
+
+def _collect_ocr_texts(note: Dict[str, Any]) -> List[str]:
+    """Return the distinct, stripped OCR strings of ``note`` in document order."""
     ocr_texts: List[str] = []
     seen = set()
 
-    def _collect_ocr(data: Any, path: str = "") -> None:
-        if isinstance(data, dict):
+    # Depth-first walk with an explicit stack. Dicts and lists are still to be
+    # visited; strings are OCR values to emit, queued in document order.
+    stack: List[Any] = [note]
+    while stack:
+        data = stack.pop()
+        if isinstance(data, str):
+            normalized = data.strip()
+            if normalized not in seen:
+                seen.add(normalized)
+                ocr_texts.append(normalized)
+        elif isinstance(data, dict):
+            pending: List[Any] = []
             for key, value in data.items():
                 key_lower = key.lower()
-                if any(ocr_key in key_lower for ocr_key in ["ocr", "image_text", "img_text"]):
+                if any(ocr_key in key_lower for ocr_key in _OCR_KEYS):
                     if isinstance(value, str) and value.strip():
-                        normalized = value.strip()
-                        if normalized not in seen:
-                            seen.add(normalized)
-                            ocr_texts.append(normalized)
+                        pending.append(value)
                     elif isinstance(value, list):
                         for item in value:
                             if isinstance(item, str) and item.strip():
-                                normalized = item.strip()
-                                if normalized not in seen:
-                                    seen.add(normalized)
-                                    ocr_texts.append(normalized)
+                                pending.append(item)
                             elif isinstance(item, dict):
-                                _collect_ocr(item, f"{path}.{key}")
-                else:
-                    _collect_ocr(value, f"{path}.{key}")
+                                pending.append(item)
+                elif isinstance(value, (dict, list)):
+                    pending.append(value)
+            stack.extend(reversed(pending))
         elif isinstance(data, list):
-            for i, item in enumerate(data):
-                _collect_ocr(item, f"{path}[{i}]")
+            stack.extend(item for item in reversed(data) if isinstance(item, (dict, list)))
 
-    _collect_ocr(note)
-    return "\n\n".join(ocr_texts)
+    return ocr_texts
 
 
 def extract_post_text(note: Dict[str, Any]) -> str:
@@ -144,7 +189,43 @@ def extract_post_text(note: Dict[str, Any]) -> str:
     return "\n".join(texts)
 
 
-def check_alpha_picks_quality(note: ProcessedNote) -> tuple[bool, float, List[str]]:
+@dataclass(slots=True)
+class _NoteExtract:
+    """Text pulled from a raw note in one pass by ``_extract_all``."""
+
+    post_text: str
+    ocr_text: str
+    combined: str  # post_text + " " + ocr_text
+    selection_date: Optional[str]
+
+
+def _extract_all(note: Dict[str, Any]) -> _NoteExtract:
+    """Extract post text, OCR text and the first YYYY-MM-DD selection date together.
+
+    The date is looked up in the post text, then in each OCR string as it is
+    collected; a match cannot span the separators, so this finds the same date
+    as searching the combined text.
+    """
+    post_text = extract_post_text(note)
+    ocr_texts = _collect_ocr_texts(note)
+    date_match = _DATE_EXTRACT_RE.search(post_text)
+    if date_match is None:
+        for text in ocr_texts:
+            date_match = _DATE_EXTRACT_RE.search(text)
+            if date_match is not None:
+                break
+    ocr_text = "\n\n".join(ocr_texts)
+    return _NoteExtract(
+        post_text=post_text,
+        ocr_text=ocr_text,
+        combined=post_text + " " + ocr_text,
+        selection_date=date_match.group(1) if date_match else None,
+    )
+
+
+def check_alpha_picks_quality(
+    note: ProcessedNote, combined_text: Optional[str] = None
+) -> tuple[bool, float, List[str]]:
     """
     Check if a note represents high-quality Alpha Picks content.
     
@@ -153,17 +234,18 @@ def check_alpha_picks_quality(note: ProcessedNote) -> tuple[bool, float, List[st
     - Should reference Seeking Alpha or Alpha Picks service
     - Should have selection dates
     - Should have substantial content (text + OCR)
+
+    ``combined_text`` is the lowercased "post_text ocr_text"; callers that
+    already built it can pass it in to avoid lowercasing the note again.
     """
     quality_notes: List[str] = []
     score = 0.0
 
-    combined_text = (note.post_text or "").lower() + " " + (note.ocr_text or "").lower()
+    if combined_text is None:
+        combined_text = (note.post_text or "").lower() + " " + (note.ocr_text or "").lower()
 
     # Check for Seeking Alpha / Alpha Picks reference
-    has_seeking_alpha = any(
-        term in combined_text
-        for term in ["seeking alpha", "alpha picks", "alpha pick", "seekingalpha"]
-    )
+    has_seeking_alpha = "alpha" in combined_text and _ALPHA_RE.search(combined_text) is not None
     if has_seeking_alpha:
         score += 0.3
         quality_notes.append("References Seeking Alpha/Alpha Picks")
@@ -172,27 +254,15 @@ def check_alpha_picks_quality(note: ProcessedNote) -> tuple[bool, float, List[st
 
     # Check for multiple selections (count numbers that might be stock picks)
     # Look for patterns like "1.", "2.", numbers in lists, or multiple stock symbols
-    selection_patterns = [
-        r"\d+[\.\)]\s*[A-Z]{2,5}",  # "1. AAPL", "2) TSLA"
-        r"[A-Z]{2,5}[\s,]+[A-Z]{2,5}",  # "AAPL TSLA", "AAPL, TSLA"
-        r"第[一二三四五六七八九十\d]+[只个股个]",  # Chinese: "第一只", "第3个"
-        r"(\d+)[个只支项]",  # Chinese: "3个", "5只"
-    ]
-
     selection_count = 0
-    for pattern in selection_patterns:
-        matches = re.findall(pattern, combined_text)
-        if matches:
+    for found in _SELECTION_RE.finditer(combined_text):
+        kind = found.lastgroup
+        if kind == "zh_count":
             # Try to extract numbers
-            for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0]
-                if match.isdigit():
-                    selection_count = max(selection_count, int(match))
-                else:
-                    # Count distinct stock-like symbols
-                    symbols = re.findall(r"[A-Z]{2,5}", match)
-                    selection_count = max(selection_count, len(symbols))
+            selection_count = max(selection_count, int(found.group(kind)))
+        else:
+            # Count stock-like symbols
+            selection_count = max(selection_count, _SYMBOLS_PER_SELECTION[kind])
 
     if selection_count >= 3:
         score += 0.4
@@ -204,14 +274,7 @@ def check_alpha_picks_quality(note: ProcessedNote) -> tuple[bool, float, List[st
         quality_notes.append("No clear multiple selections found")
 
     # Check for selection date
-    date_patterns = [
-        r"\d{4}[-/]\d{2}[-/]\d{2}",  # YYYY-MM-DD
-        r"\d{2}[-/]\d{2}[-/]\d{4}",  # MM-DD-YYYY
-        r"(\d{4})\.(\d{2})\.(\d{2})",  # YYYY.MM.DD
-        r"(\d{1,2})[月/](\d{1,2})[日]",  # Chinese: "1月1日"
-    ]
-
-    has_date = any(re.search(pattern, combined_text) for pattern in date_patterns)
+    has_date = _HAS_DATE_RE.search(combined_text) is not None
     if has_date or note.selection_date:
         score += 0.2
         quality_notes.append("Contains selection date")
@@ -234,87 +297,42 @@ def check_alpha_picks_quality(note: ProcessedNote) -> tuple[bool, float, List[st
     return is_high_quality, score, quality_notes
 
 
-def process_notes(
-    raw_notes: List[Dict[str, Any]],
-    days_filter: int = 2,
-    max_results: int = 1,
-    filter_today: bool = False,
-    filter_latest_date: bool = False,
-) -> tuple[List[ProcessedNote], datetime | None]:
+def _note_dates(raw_note: Dict[str, Any]) -> tuple[Optional[datetime], Optional[datetime]]:
+    """Return the note's publish/update date and any YYYY-MM-DD date in its title/desc."""
+    note_date = extract_date_from_note(raw_note)
+
+    # Also check selection date from text (this might be more accurate)
+    # Ensure we always have strings (handle None values)
+    title = raw_note.get("title") or ""
+    desc = raw_note.get("desc") or ""
+    post_text = str(title) + " " + str(desc)
+    date_match = _DATE_EXTRACT_RE.search(post_text)
+    selection_date_from_text: datetime | None = None
+    if date_match:
+        try:
+            date_str = date_match.group(1).replace("/", "-")
+            selection_date_from_text = datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            pass
+    return note_date, selection_date_from_text
+
+
+def _iter_processed_notes(
+    dated_notes: Iterable[tuple[Dict[str, Any], Optional[datetime], Optional[datetime]]],
+    cutoff_date: datetime,
+    exact_date: bool,
+    keep_raw: bool,
+) -> Iterator[ProcessedNote]:
+    """Yield quality-checked notes dated on (``exact_date``) or after ``cutoff_date``.
+
+    ``dated_notes`` holds ``(raw_note, note_date, selection_date_from_text)``
+    triples as returned by ``_note_dates``.
     """
-    Process and filter notes based on date, quality, and requirements.
-    
-    Args:
-        raw_notes: List of raw note dictionaries from MCP
-        days_filter: Only keep notes from last N days (default: 2)
-        max_results: Maximum number of high-quality results to return (default: 1)
-        filter_today: If True, only keep notes from today
-        filter_latest_date: If True, find the latest date in notes and filter to that date
-    
-    Returns:
-        Tuple of (processed notes, target date for logging)
-    """
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    if filter_today:
-        cutoff_date = today
-        target_date = today
-    elif filter_latest_date:
-        # First pass: extract all dates to find the latest
-        all_dates: List[datetime] = []
-        for raw_note in raw_notes:
-            note_date = extract_date_from_note(raw_note)
-            if note_date:
-                # Also check selection date from text
-                title = raw_note.get("title") or ""
-                desc = raw_note.get("desc") or ""
-                post_text = str(title) + " " + str(desc)
-                date_match = re.search(r"(\d{4}[-/]\d{2}[-/]\d{2})", post_text)
-                if date_match:
-                    try:
-                        date_str = date_match.group(1).replace("/", "-")
-                        parsed_date = datetime.strptime(date_str, "%Y-%m-%d")
-                        all_dates.append(parsed_date.replace(hour=0, minute=0, second=0, microsecond=0))
-                    except ValueError:
-                        pass
-                all_dates.append(note_date.replace(hour=0, minute=0, second=0, microsecond=0))
-        
-        if all_dates:
-            target_date = max(all_dates)
-            cutoff_date = target_date
-        else:
-            # Fallback to today if no dates found
-            target_date = today
-            cutoff_date = today - timedelta(days=days_filter)
-    else:
-        cutoff_date = today - timedelta(days=days_filter)
-        target_date = None
-    
-    processed: List[ProcessedNote] = []
-
-    for raw_note in raw_notes:
+    for raw_note, note_date, selection_date_from_text in dated_notes:
         note_id = raw_note.get("note_id") or raw_note.get("id") or raw_note.get("noteId", "")
         if not note_id:
             continue
 
-        # Extract date
-        note_date = extract_date_from_note(raw_note)
-        
-        # Also check selection date from text (this might be more accurate)
-        # Ensure we always have strings (handle None values)
-        title = raw_note.get("title") or ""
-        desc = raw_note.get("desc") or ""
-        post_text = str(title) + " " + str(desc)
-        date_match = re.search(r"(\d{4}[-/]\d{2}[-/]\d{2})", post_text)
-        selection_date_from_text: datetime | None = None
-        if date_match:
-            try:
-                date_str = date_match.group(1).replace("/", "-")
-                selection_date_from_text = datetime.strptime(date_str, "%Y-%m-%d")
-                selection_date_from_text = selection_date_from_text.replace(hour=0, minute=0, second=0, microsecond=0)
-            except ValueError:
-                pass
-        
         # Use selection date from text if available, otherwise use note_date
         effective_date = selection_date_from_text or note_date
         
@@ -323,7 +341,7 @@ def process_notes(
             effective_date_normalized = effective_date.replace(hour=0, minute=0, second=0, microsecond=0)
             cutoff_date_normalized = cutoff_date.replace(hour=0, minute=0, second=0, microsecond=0) if cutoff_date else None
             
-            if filter_today or filter_latest_date:
+            if exact_date:
                 # For today/latest mode, only keep notes matching exactly
                 if effective_date_normalized != cutoff_date_normalized:
                     continue
@@ -331,60 +349,108 @@ def process_notes(
                 # For days_filter mode, keep notes from cutoff_date onwards
                 if effective_date_normalized < cutoff_date_normalized:
                     continue
-        elif filter_today or filter_latest_date:
+        elif exact_date:
             # If we require exact date match but no date found, skip
             continue
 
-        # Extract texts
-        post_text = extract_post_text(raw_note)
-        ocr_text = extract_ocr_text(raw_note)
-
-        # Extract selection date from text (look for dates in title/description)
-        combined = (post_text + " " + ocr_text).lower()
-        date_match = re.search(r"(\d{4}[-/]\d{2}[-/]\d{2})", combined)
-        selection_date = date_match.group(1) if date_match else None
+        # Extract texts and the selection date (look for dates in title/description/OCR)
+        extract = _extract_all(raw_note)
 
         # Get publish time string
-        publish_time = note_date.strftime("%Y-%m-%d %H:%M:%S") if note_date else None
+        publish_time = note_date.isoformat(sep=" ", timespec="seconds") if note_date else None
 
         # Create processed note
         processed_note = ProcessedNote(
             note_id=str(note_id),
             title=raw_note.get("title") or raw_note.get("note_title") or raw_note.get("name"),
-            post_text=post_text,
-            ocr_text=ocr_text,
+            post_text=extract.post_text,
+            ocr_text=extract.ocr_text,
             author=raw_note.get("user_nickname") or raw_note.get("user_name") or raw_note.get("author"),
             url=raw_note.get("note_url") or raw_note.get("url") or raw_note.get("share_link"),
-            selection_date=selection_date,
+            selection_date=extract.selection_date,
             publish_time=publish_time,
-            raw=raw_note,
+            raw=raw_note if keep_raw else {},
         )
 
         # Quality check
-        is_high_quality, score, quality_notes = check_alpha_picks_quality(processed_note)
+        is_high_quality, score, quality_notes = check_alpha_picks_quality(processed_note, extract.combined.lower())
         processed_note.is_high_quality = is_high_quality
         processed_note.quality_score = score
         processed_note.quality_notes = quality_notes
 
-        processed.append(processed_note)
+        yield processed_note
+
+
+def _note_rank(note: ProcessedNote) -> tuple[bool, float, str]:
+    """Sort key for processed notes: quality flag, then score, then publish time."""
+    return note.is_high_quality, note.quality_score, note.publish_time or ""
 
-    # Sort by quality score (descending) and then by date (descending)
-    processed.sort(
-        key=lambda n: (
-            n.is_high_quality,
-            n.quality_score,
-            n.publish_time or "",
-        ),
-        reverse=True,
+
+def process_notes(
+    raw_notes: List[Dict[str, Any]],
+    days_filter: int = 2,
+    max_results: int = 1,
+    filter_today: bool = False,
+    filter_latest_date: bool = False,
+    keep_raw: bool = False,
+) -> tuple[List[ProcessedNote], datetime | None]:
+    """
+    Process and filter notes based on date, quality, and requirements.
+    
+    Args:
+        raw_notes: List of raw note dictionaries from MCP
+        days_filter: Only keep notes from last N days (default: 2)
+        max_results: Maximum number of high-quality results to return (default: 1)
+        filter_today: If True, only keep notes from today
+        filter_latest_date: If True, find the latest date in notes and filter to that date
+        keep_raw: If True, keep each raw MCP note on ``ProcessedNote.raw`` (default: dropped
+            so large payloads are not kept alive by the results)
+    
+    Returns:
+        Tuple of (processed notes, target date for logging)
+    """
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    dated_notes: Iterable[tuple[Dict[str, Any], Optional[datetime], Optional[datetime]]] = (
+        (raw_note, *_note_dates(raw_note)) for raw_note in raw_notes
     )
 
+    if filter_today:
+        cutoff_date = today
+        target_date = today
+    elif filter_latest_date:
+        # Date every note once, then filter the same entries to the latest date found
+        dated_notes = list(dated_notes)
+        all_dates = [
+            date.replace(hour=0, minute=0, second=0, microsecond=0)
+            for _, note_date, text_date in dated_notes
+            if note_date
+            for date in (text_date, note_date)
+            if date
+        ]
+
+        if all_dates:
+            target_date = max(all_dates)
+            cutoff_date = target_date
+        else:
+            # Fallback to today if no dates found
+            target_date = today
+            cutoff_date = today - timedelta(days=days_filter)
+    else:
+        cutoff_date = today - timedelta(days=days_filter)
+        target_date = None
+    
+    notes = _iter_processed_notes(dated_notes, cutoff_date, filter_today or filter_latest_date, keep_raw)
+
+    # Keep the top N by quality flag, then score, then date (descending), without
+    # sorting every note; heapq.nlargest matches sorted(..., reverse=True)[:N]
+    top = heapq.nlargest(max_results, notes, key=_note_rank)
+
     # Return top N results, prioritizing high quality but including others if needed
-    # This ensures we always have something to summarize even if quality is lower
-    high_quality = [n for n in processed if n.is_high_quality]
-    if high_quality:
+    # This ensures we always have something to summarize even if quality is lower.
+    # High-quality notes rank first, so if any exist they lead ``top``.
+    if top and top[0].is_high_quality:
         # If we have high quality notes, return them (up to max_results)
-        return high_quality[:max_results], target_date
-    else:
-        # If no high quality, return top N by score anyway (for logging/summary purposes)
-        return processed[:max_results] if processed else [], target_date
+        return [n for n in top if n.is_high_quality], target_date
+    # If no high quality, return top N by score anyway (for logging/summary purposes)
+    return top, target_date
 
@@ -2,11 +2,42 @@ import json
 from pathlib import Path
 from typing import Dict
 
+import pytest
+
 from xhs_alpha_picks.cli import main
 from xhs_alpha_picks.mcp_client import MCPError
 from xhs_alpha_picks.note_parser import extract_notes
 
 
+class GrepStream:
+    """Minimal text stream for ``main`` that records writes for substring checks."""
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+
+    def write(self, text: str) -> int:
+        self.parts.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def contains(self, substring: str) -> bool:
+        return any(substring in part for part in self.parts)
+
+
+class DummyClientBase:
+    """Context-manager support that ``main`` expects from the MCP client."""
+
+    closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+
 def build_fake_payload(keyword: str) -> Dict[str, object]:
     return {
         "data": {
@@ -27,10 +58,11 @@ def test_cli_offline_mode(tmp_path: Path, monkeypatch):
     payload = build_fake_payload(keyword)
 
     output_path = tmp_path / "payload.json"
+    created = []
 
-    class DummyClient:
+    class DummyClient(DummyClientBase):
         def __init__(self, *args, **kwargs):
-            pass
+            created.append(self)
 
         def ping(self):
             return None
@@ -41,9 +73,7 @@ def test_cli_offline_mode(tmp_path: Path, monkeypatch):
 
     monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
 
-    from io import StringIO
-
-    buffer = StringIO()
+    buffer = GrepStream()
     exit_code = main(
         [
             "--keyword",
@@ -60,13 +90,13 @@ def test_cli_offline_mode(tmp_path: Path, monkeypatch):
     assert exit_code == 0
     saved = json.loads(output_path.read_text(encoding="utf-8"))
     assert saved == payload
-    text = buffer.getvalue()
-    assert "Retrieved 1 notes" in text
-    assert keyword in text
+    assert buffer.contains("Retrieved 1 notes")
+    assert buffer.contains(keyword)
+    assert created[0].closed
 
 
 def test_cli_check_connection_success(monkeypatch):
-    class DummyClient:
+    class DummyClient(DummyClientBase):
         base_url = "http://example.com"
         search_path = "/mcp/tools/search"
         search_url = "http://example.com/mcp/tools/search"
@@ -80,17 +110,15 @@ def test_cli_check_connection_success(monkeypatch):
 
     monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
 
-    from io import StringIO
-
-    buffer = StringIO()
+    buffer = GrepStream()
     exit_code = main(["--check-connection"], stream=buffer)
 
     assert exit_code == 0
-    assert "is reachable" in buffer.getvalue()
+    assert buffer.contains("is reachable")
 
 
 def test_cli_check_connection_failure(monkeypatch):
-    class DummyClient:
+    class DummyClient(DummyClientBase):
         base_url = "http://example.com"
         search_path = "/mcp/tools/search"
         search_url = "http://example.com/mcp/tools/search"
@@ -104,17 +132,15 @@ def test_cli_check_connection_failure(monkeypatch):
 
     monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
 
-    from io import StringIO
-
-    buffer = StringIO()
+    buffer = GrepStream()
     exit_code = main(["--check-connection"], stream=buffer)
 
     assert exit_code == 2
-    assert "boom" in buffer.getvalue()
+    assert buffer.contains("boom")
 
 
 def test_cli_ping_failure(monkeypatch):
-    class DummyClient:
+    class DummyClient(DummyClientBase):
         base_url = "http://example.com"
         search_path = "/mcp/tools/search"
         search_url = "http://example.com/mcp/tools/search"
@@ -128,19 +154,16 @@ def test_cli_ping_failure(monkeypatch):
 
     monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
 
-    from io import StringIO
-
-    buffer = StringIO()
+    buffer = GrepStream()
     exit_code = main(["--keyword", "alpha pick 2099-01-01"], stream=buffer)
 
     assert exit_code == 2
-    text = buffer.getvalue()
-    assert "unreachable" in text
-    assert "connection refused" in text
+    assert buffer.contains("unreachable")
+    assert buffer.contains("connection refused")
 
 
 def test_cli_debug_prints_connection(monkeypatch):
-    class DummyClient:
+    class DummyClient(DummyClientBase):
         def __init__(self, *args, **kwargs):
             pass
 
@@ -161,23 +184,20 @@ def test_cli_debug_prints_connection(monkeypatch):
 
     monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
 
-    from io import StringIO
-
-    buffer = StringIO()
+    buffer = GrepStream()
     exit_code = main(["--debug"], stream=buffer)
 
     assert exit_code == 0
-    text = buffer.getvalue()
-    assert "MCP connection configuration" in text
-    assert "Base URL: http://localhost:18060" in text
-    assert "Search URL: http://localhost:18060/mcp/tools/search" in text
-    assert "No notes found" in text
+    assert buffer.contains("MCP connection configuration")
+    assert buffer.contains("Base URL: http://localhost:18060")
+    assert buffer.contains("Search URL: http://localhost:18060/mcp/tools/search")
+    assert buffer.contains("No notes found")
 
 
 def test_cli_accepts_mcp_api_key_override(monkeypatch):
     captured: Dict[str, object] = {}
 
-    class DummyClient:
+    class DummyClient(DummyClientBase):
         def __init__(self, *args, **kwargs):
             captured["api_key"] = kwargs.get("api_key")
 
@@ -189,10 +209,76 @@ def test_cli_accepts_mcp_api_key_override(monkeypatch):
 
     monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
 
-    from io import StringIO
-
-    buffer = StringIO()
+    buffer = GrepStream()
     exit_code = main(["--mcp-api-key", "topsecret"], stream=buffer)
 
     assert exit_code == 0
     assert captured["api_key"] == "topsecret"
+
+
+def test_cli_streams_summary(monkeypatch):
+    keyword = "alpha pick 2099-01-01"
+    payload = build_fake_payload(keyword)
+
+    class DummyClient(DummyClientBase):
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def ping(self):
+            return None
+
+        def search_notes(self, keyword: str, limit: int, raw_payload=None):
+            return {"notes": extract_notes(payload), "raw": payload}
+
+    class DummySummarizer:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def summarise_stream(self, notes, *, prompt=None, system_prompt=None):
+            assert keyword in prompt
+            return iter(["  ", "\nBuy", " the", " ", "dip \n", "\n"])
+
+    monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
+    monkeypatch.setattr("xhs_alpha_picks.summarizer.DeepSeekSummarizer", DummySummarizer)
+
+    buffer = GrepStream()
+    exit_code = main(["--keyword", keyword], stream=buffer)
+
+    assert exit_code == 0
+    summary = "".join(buffer.parts).split("=================\n", 1)[1]
+    assert summary == "Buy the dip\n"
+
+
+def test_cli_writes_no_summary_header_when_stream_fails(monkeypatch):
+    keyword = "alpha pick 2099-01-01"
+    payload = build_fake_payload(keyword)
+
+    class DummyClient(DummyClientBase):
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def ping(self):
+            return None
+
+        def search_notes(self, keyword: str, limit: int, raw_payload=None):
+            return {"notes": extract_notes(payload), "raw": payload}
+
+    class DummySummarizer:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def summarise_stream(self, notes, *, prompt=None, system_prompt=None):
+            def pieces():
+                raise ConnectionError("stream dropped")
+                yield ""
+
+            return pieces()
+
+    monkeypatch.setattr("xhs_alpha_picks.cli.XiaohongshuMCPClient", DummyClient)
+    monkeypatch.setattr("xhs_alpha_picks.summarizer.DeepSeekSummarizer", DummySummarizer)
+
+    buffer = GrepStream()
+    with pytest.raises(ConnectionError):
+        main(["--keyword", keyword], stream=buffer)
+
+    assert not buffer.contains("DeepSeek summary")
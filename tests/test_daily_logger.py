@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import openai
+
+from src.xhs_alpha_picks.daily_logger import (
+    _chunk_notes,
+    _read_cached_summary,
+    _summary_cache_key,
+    _write_cached_summary,
+    generate_daily_summary,
+)
+from src.xhs_alpha_picks.note_processor import ProcessedNote
+
+
+def make_settings(model="deepseek-chat"):
+    return SimpleNamespace(
+        deepseek_api_key="test-key",
+        deepseek_base_url="https://api.deepseek.com",
+        deepseek_model=model,
+        http_client=lambda: None,
+    )
+
+
+def install_fake_openai(monkeypatch, reply="Summary for 2099-01-01"):
+    calls = []
+
+    class FakeCompletions:
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            message = SimpleNamespace(content=reply)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(openai, "AsyncOpenAI", FakeAsyncOpenAI)
+    return calls
+
+
+NOTES = [ProcessedNote(note_id="n1", title="Alpha Picks", post_text="AAPL MSFT NVDA")]
+
+
+def test_chunk_notes_splits_at_token_budget():
+    # Each 40-character text is estimated at 10 tokens
+    texts = ["a" * 40, "b" * 40, "c" * 40, "d" * 40, "e" * 40]
+
+    assert _chunk_notes(texts, max_tokens=20) == [texts[0:2], texts[2:4], texts[4:5]]
+    assert _chunk_notes(texts, max_tokens=19) == [[text] for text in texts]
+
+
+def test_chunk_notes_keeps_oversized_text_alone():
+    texts = ["a" * 400, "b" * 4]
+
+    assert _chunk_notes(texts, max_tokens=10) == [[texts[0]], [texts[1]]]
+    assert _chunk_notes([], max_tokens=10) == []
+
+
+def test_summary_cache_key_depends_on_every_part():
+    key = _summary_cache_key("deepseek-chat", "prompt", "2099-01-01")
+
+    assert key == _summary_cache_key("deepseek-chat", "prompt", "2099-01-01")
+    assert key != _summary_cache_key("deepseek-reasoner", "prompt", "2099-01-01")
+    assert key != _summary_cache_key("deepseek-chat", "prompt", "2099-01-02")
+    # Parts are delimited, so moving text across a boundary changes the key
+    assert _summary_cache_key("ab", "c") != _summary_cache_key("a", "bc")
+
+
+def test_cached_summary_round_trip(tmp_path):
+    cache_path = tmp_path / "cache" / "entry.json"
+
+    assert _read_cached_summary(cache_path) is None
+    _write_cached_summary(cache_path, "cached text", "deepseek-chat")
+    assert _read_cached_summary(cache_path) == "cached text"
+
+    cache_path.write_text("{not json", encoding="utf-8")
+    assert _read_cached_summary(cache_path) is None
+
+
+def test_generate_daily_summary_cache_miss_then_hit(tmp_path, monkeypatch):
+    calls = install_fake_openai(monkeypatch)
+    date = datetime(2099, 1, 1)
+
+    first = asyncio.run(generate_daily_summary(NOTES, make_settings(), date, cache_dir=tmp_path))
+    second = asyncio.run(generate_daily_summary(NOTES, make_settings(), date, cache_dir=tmp_path))
+
+    assert first == second == "Summary for 2099-01-01"
+    assert len(calls) == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_generate_daily_summary_cache_misses_on_new_model_or_date(tmp_path, monkeypatch):
+    calls = install_fake_openai(monkeypatch)
+
+    asyncio.run(generate_daily_summary(NOTES, make_settings(), datetime(2099, 1, 1), cache_dir=tmp_path))
+    asyncio.run(
+        generate_daily_summary(NOTES, make_settings("deepseek-reasoner"), datetime(2099, 1, 1), cache_dir=tmp_path)
+    )
+    asyncio.run(generate_daily_summary(NOTES, make_settings(), datetime(2099, 1, 2), cache_dir=tmp_path))
+
+    assert [call["model"] for call in calls] == ["deepseek-chat", "deepseek-reasoner", "deepseek-chat"]
+    assert len(list(tmp_path.glob("*.json"))) == 3
@@ -0,0 +1,112 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.xhs_alpha_picks.llm_agent import AlphaPickSearchAgent, SearchOutcome
+
+
+class FakeBatchClient:
+    """Just enough of AsyncOpenAI's files/batches API for search_keywords_batch."""
+
+    def __init__(self, statuses, output_lines):
+        self.statuses = list(statuses)
+        self.output_lines = output_lines
+        self.uploaded: list[dict] = []
+        self.retrieved = 0
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _batch(self):
+        status = self.statuses.pop(0)
+        output_file_id = "file-out" if status == "completed" else None
+        return SimpleNamespace(id="batch-1", status=status, output_file_id=output_file_id)
+
+    async def _create_file(self, *, file, purpose):
+        assert purpose == "batch"
+        self.uploaded = [json.loads(line) for line in file[1].decode("utf-8").splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    async def _create_batch(self, *, input_file_id, endpoint, completion_window):
+        assert (input_file_id, endpoint) == ("file-in", "/v1/chat/completions")
+        return self._batch()
+
+    async def _retrieve_batch(self, batch_id):
+        self.retrieved += 1
+        return self._batch()
+
+    async def _file_content(self, file_id):
+        assert file_id == "file-out"
+        return SimpleNamespace(text="\n".join(json.dumps(line) for line in self.output_lines))
+
+
+def make_agent(monkeypatch, client):
+    settings = SimpleNamespace(
+        deepseek_api_key="test-key",
+        deepseek_base_url="https://api.deepseek.com",
+        deepseek_model="deepseek-chat",
+        http_client=lambda: None,
+    )
+    agent = AlphaPickSearchAgent(settings)
+    agent._client = client
+    # Pretend ``async with agent:`` already connected, so no MCP session is opened
+    agent._session_state = (None, "search", {})
+    searched: list[str] = []
+
+    async def fake_search_keyword(keyword, *, summarize=True, **kwargs):
+        assert summarize is False
+        searched.append(keyword)
+        return SearchOutcome(
+            keyword=keyword,
+            summary="",
+            raw_results=[],
+            processed_notes=[],
+            target_date=None,
+            scan_mode="latest",
+            connected_url="http://127.0.0.1:18060/mcp",
+            tool_name="search",
+            llm_usage={"initial": None, "summary": None},
+            llm_messages=[{"role": "user", "content": keyword}],
+        )
+
+    monkeypatch.setattr(agent, "search_keyword", fake_search_keyword)
+    return agent, searched
+
+
+def batch_record(keyword, content):
+    return {
+        "custom_id": keyword,
+        "response": {
+            "body": {
+                "choices": [{"message": {"role": "assistant", "content": f" {content} "}}],
+                "usage": {"total_tokens": 7},
+            }
+        },
+    }
+
+
+def test_search_keywords_batch_submits_one_job_and_attaches_summaries(monkeypatch):
+    client = FakeBatchClient(
+        ["validating", "in_progress", "completed"],
+        [batch_record("beta", "beta summary"), batch_record("alpha", "alpha summary")],
+    )
+    agent, searched = make_agent(monkeypatch, client)
+
+    outcomes = asyncio.run(agent.search_keywords_batch(["alpha", "beta", "alpha"], poll_interval=0))
+
+    assert searched == ["alpha", "beta"]
+    assert [request["custom_id"] for request in client.uploaded] == ["alpha", "beta"]
+    assert client.uploaded[0]["body"]["messages"] == [{"role": "user", "content": "alpha"}]
+    assert client.retrieved == 2
+    assert [outcome.summary for outcome in outcomes] == ["alpha summary", "beta summary"]
+    assert outcomes[0].llm_usage["summary"] == {"total_tokens": 7}
+    assert outcomes[0].llm_messages[-1] == {"role": "assistant", "content": " alpha summary "}
+
+
+def test_search_keywords_batch_raises_when_job_fails(monkeypatch):
+    client = FakeBatchClient(["failed"], [])
+    agent, _ = make_agent(monkeypatch, client)
+
+    with pytest.raises(RuntimeError, match="'failed'"):
+        asyncio.run(agent.search_keywords_batch(["alpha"], poll_interval=0))
@@ -0,0 +1,208 @@
+import asyncio
+
+import pytest
+
+import src.xhs_alpha_picks.mcp_client as mcp_client
+from src.xhs_alpha_picks.mcp_client import MCPConnectionError
+
+
+class FakeSession:
+    def __init__(self, url):
+        self.url = url
+        self.alive = True
+
+    async def list_tools(self):
+        if not self.alive:
+            raise ConnectionError("session closed")
+        return []
+
+
+class FakeGroup:
+    """Stands in for ClientSessionGroup and records when its holder closes it."""
+
+    instances: list["FakeGroup"] = []
+
+    def __init__(self):
+        self.closed = False
+        FakeGroup.instances.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+
+class FakeServers:
+    """Scripted ``_open_candidate``: each URL answers or fails after a delay."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour  # url -> (delay seconds, error or None)
+        self.opened: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def __call__(self, group, candidate):
+        delay, error = self.behaviour[candidate]
+        self.opened.append(candidate)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(candidate)
+            raise
+        if error is not None:
+            raise error
+        return FakeSession(candidate)
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+    FakeGroup.instances = []
+    monkeypatch.setattr(mcp_client, "ClientSessionGroup", FakeGroup)
+    monkeypatch.setattr(mcp_client, "_CONNECT_STAGGER", 0.0)
+    monkeypatch.setattr(mcp_client, "_CIRCUIT", {})
+    monkeypatch.setattr(mcp_client, "_POOL", {})
+
+
+def install_servers(monkeypatch, behaviour):
+    servers = FakeServers(behaviour)
+    monkeypatch.setattr(mcp_client, "_open_candidate", servers)
+    return servers
+
+
+def test_circuit_trips_after_threshold_consecutive_failures():
+    url = "http://a/mcp"
+
+    for _ in range(mcp_client._CIRCUIT_THRESHOLD - 1):
+        mcp_client._record_failure(url)
+        assert not mcp_client._circuit_open(url)
+
+    mcp_client._record_failure(url)
+    assert mcp_client._circuit_open(url)
+    assert mcp_client._CIRCUIT[url][0] == mcp_client._CIRCUIT_THRESHOLD
+
+
+def test_circuit_closes_after_cooldown(monkeypatch):
+    url = "http://a/mcp"
+    now = 1000.0
+    monkeypatch.setattr(mcp_client.time, "monotonic", lambda: now)
+    for _ in range(mcp_client._CIRCUIT_THRESHOLD):
+        mcp_client._record_failure(url)
+    assert mcp_client._circuit_open(url)
+
+    now += mcp_client._CIRCUIT_COOLDOWN + 1
+    assert not mcp_client._circuit_open(url)
+
+
+def test_backoff_delay_grows_with_failures_and_is_capped(monkeypatch):
+    url = "http://a/mcp"
+    monkeypatch.setattr(mcp_client.random, "uniform", lambda low, high: high)
+
+    ceilings = []
+    for _ in range(len(mcp_client._BACKOFF) + 2):
+        ceilings.append(mcp_client._backoff_delay(url))
+        mcp_client._record_failure(url)
+
+    assert ceilings == [0.1, 0.2, 0.4, 0.4, 0.4]
+
+
+def test_race_returns_fastest_candidate_and_cancels_losers(monkeypatch):
+    servers = install_servers(
+        monkeypatch,
+        {
+            "http://slow/mcp": (10.0, None),
+            "http://fast/mcp": (0.0, None),
+        },
+    )
+    mcp_client._CIRCUIT["http://fast/mcp"] = (1, 0.0)
+
+    async def scenario():
+        connection, release, holder = await mcp_client._race_candidates(
+            ["http://slow/mcp", "http://fast/mcp"]
+        )
+        assert not holder.done()
+        await mcp_client._release_candidates(release, holder, ())
+        return connection
+
+    connection = asyncio.run(scenario())
+
+    assert connection.connected_url == "http://fast/mcp"
+    assert servers.cancelled == ["http://slow/mcp"]
+    assert all(group.closed for group in FakeGroup.instances)
+    # A success resets the winner's failure count
+    assert "http://fast/mcp" not in mcp_client._CIRCUIT
+
+
+def test_race_records_failures_when_every_candidate_fails(monkeypatch):
+    install_servers(
+        monkeypatch,
+        {
+            "http://a/mcp": (0.0, ConnectionError("refused")),
+            "http://b/mcp": (0.0, ConnectionError("refused")),
+        },
+    )
+
+    with pytest.raises(MCPConnectionError, match="attempts failed"):
+        asyncio.run(mcp_client._race_candidates(["http://a/mcp", "http://b/mcp"]))
+
+    assert mcp_client._CIRCUIT["http://a/mcp"][0] == 1
+    assert mcp_client._CIRCUIT["http://b/mcp"][0] == 1
+
+
+def test_race_skips_candidates_with_open_circuit(monkeypatch):
+    servers = install_servers(monkeypatch, {"http://a/mcp": (0.0, None), "http://b/mcp": (0.0, None)})
+    for _ in range(mcp_client._CIRCUIT_THRESHOLD):
+        mcp_client._record_failure("http://a/mcp")
+
+    with pytest.raises(MCPConnectionError, match="circuit open"):
+        asyncio.run(mcp_client._race_candidates(["http://a/mcp"]))
+    assert servers.opened == []
+
+    async def scenario():
+        connection, release, holder = await mcp_client._race_candidates(["http://a/mcp", "http://b/mcp"])
+        await mcp_client._release_candidates(release, holder, ())
+        return connection
+
+    assert asyncio.run(scenario()).connected_url == "http://b/mcp"
+    assert servers.opened == ["http://b/mcp"]
+
+
+def test_pooled_connection_shares_one_race_and_close_pool_releases_it(monkeypatch):
+    servers = install_servers(monkeypatch, {"http://a/mcp": (0.01, None)})
+
+    async def use():
+        async with mcp_client.pooled_connection(["http://a/mcp"]) as connection:
+            return connection
+
+    async def scenario():
+        first, second = await asyncio.gather(use(), use())
+        third = await use()
+        assert first is second is third
+        assert len(mcp_client._POOL) == 1
+        await mcp_client.close_pool()
+
+    asyncio.run(scenario())
+
+    assert servers.opened == ["http://a/mcp"]
+    assert mcp_client._POOL == {}
+    assert [group.closed for group in FakeGroup.instances] == [True]
+
+
+def test_pooled_connection_replaces_stale_session(monkeypatch):
+    servers = install_servers(monkeypatch, {"http://a/mcp": (0.0, None)})
+
+    async def use():
+        async with mcp_client.pooled_connection(["http://a/mcp"]) as connection:
+            return connection
+
+    async def scenario():
+        stale = await use()
+        stale.session.alive = False
+        fresh = await use()
+        await mcp_client.close_pool()
+        return stale, fresh
+
+    stale, fresh = asyncio.run(scenario())
+
+    assert fresh is not stale
+    assert servers.opened == ["http://a/mcp", "http://a/mcp"]
+    assert [group.closed for group in FakeGroup.instances] == [True, True]
@@ -1,7 +1,84 @@
+from http.client import RemoteDisconnected
 import json
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+import pytest
 
 from xhs_alpha_picks.config import Settings
-from xhs_alpha_picks.mcp_client import XiaohongshuMCPClient
+from xhs_alpha_picks.mcp_client import MCPError, XiaohongshuMCPClient
+
+
+class SentRequest(NamedTuple):
+    method: str
+    target: str
+    body: bytes
+    headers: Dict[str, str]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, status: int = 200) -> None:
+        self.body = body
+        self.status = status
+
+    def read(self) -> bytes:
+        return self.body
+
+
+class FakeServer:
+    """Stands in for the MCP server behind the patched ``HTTPConnection``.
+
+    ``response_body`` is the bytes to answer with, or a callable mapping the
+    request body to them; ``on_request`` may raise to simulate socket errors.
+    """
+
+    def __init__(self) -> None:
+        self.connections: List["FakeConnection"] = []
+        self.response_body: Union[bytes, Callable[[bytes], bytes]] = b"{}"
+        self.on_request: Optional[Callable[["FakeConnection"], None]] = None
+
+
+class FakeConnection:
+    def __init__(self, server: FakeServer, host, port, timeout) -> None:
+        self.server = server
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock: Optional[object] = None
+        self.connects = 0
+        self.closed = False
+        self.requests: List[SentRequest] = []
+        self._last_body = b""
+        server.connections.append(self)
+
+    def connect(self) -> None:
+        self.connects += 1
+        self.sock = object()
+
+    def request(self, method, target, body, headers) -> None:
+        if self.sock is None:
+            self.connect()
+        self.requests.append(SentRequest(method, target, body, headers))
+        self._last_body = body
+        if self.server.on_request is not None:
+            self.server.on_request(self)
+
+    def getresponse(self) -> FakeResponse:
+        body = self.server.response_body
+        return FakeResponse(body(self._last_body) if callable(body) else body)
+
+    def close(self) -> None:
+        self.closed = True
+        self.sock = None
+
+
+@pytest.fixture
+def fake_server(monkeypatch) -> FakeServer:
+    server = FakeServer()
+    monkeypatch.setattr(
+        "xhs_alpha_picks.mcp_client.HTTPConnection",
+        lambda host, port, timeout: FakeConnection(server, host, port, timeout),
+    )
+    return server
 
 
 def make_settings(**overrides):
@@ -55,34 +132,102 @@ def test_headers_include_required_accept_values():
     assert headers["Accept"] == "application/json, text/event-stream"
 
 
-def test_search_notes_wraps_arguments_and_version(monkeypatch):
-    captured = {}
-
-    class DummyResponse:
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
+def test_returned_headers_and_info_are_copies(fake_server):
+    client = XiaohongshuMCPClient(settings=make_settings())
+    client.build_headers()["Accept"] = "text/plain"
+    client.connection_info()["timeout"] = 0
 
-        def read(self):
-            return b"{}"
+    client.search_notes("alpha")
 
-    def fake_urlopen(request, timeout):
-        captured["data"] = request.data
-        captured["headers"] = request.headers
-        captured["timeout"] = timeout
-        return DummyResponse()
+    assert fake_server.connections[0].requests[0].headers["Accept"] == "application/json, text/event-stream"
+    assert client.connection_info()["timeout"] == client.timeout
 
-    monkeypatch.setattr("xhs_alpha_picks.mcp_client.urlopen", fake_urlopen)
 
+def test_search_notes_wraps_arguments_and_version(fake_server):
     client = XiaohongshuMCPClient(settings=make_settings())
     client.search_notes("alpha", limit=3, raw_payload={"extra": True})
 
-    payload = json.loads(captured["data"].decode("utf-8"))
+    payload = json.loads(fake_server.connections[0].requests[0].body.decode("utf-8"))
     assert payload["version"] == "2.0"
     assert payload["arguments"]["keyword"] == "alpha"
     assert payload["arguments"]["page_size"] == 3
     assert payload["arguments"]["extra"] is True
 
 
+def test_search_notes_reuses_connection_and_retries_stale_socket(fake_server):
+    def drop_third_request(connection):
+        if len(fake_server.connections) == 1 and len(connection.requests) == 3:
+            raise RemoteDisconnected("idle keep-alive closed")
+
+    fake_server.response_body = b'{"data": {"notes": []}}'
+    fake_server.on_request = drop_third_request
+
+    client = XiaohongshuMCPClient(settings=make_settings())
+    for _ in range(3):
+        assert client.search_notes("alpha")["notes"] == []
+
+    first, second = fake_server.connections
+    assert [(r.method, r.target) for r in first.requests] == [("POST", "/mcp/tools/search")] * 3
+    assert len(second.requests) == 1
+
+
+def test_client_context_manager_closes_connection(fake_server):
+    with XiaohongshuMCPClient(settings=make_settings()) as client:
+        client.search_notes("alpha")
+        assert not fake_server.connections[0].closed
+
+    assert fake_server.connections[0].closed
+
+
+def test_search_many_returns_results_in_keyword_order(fake_server):
+    def echo_keyword(body):
+        keyword = json.loads(body)["arguments"]["keyword"]
+        return json.dumps({"data": {"notes": [{"id": keyword, "title": keyword}]}}).encode("utf-8")
+
+    fake_server.response_body = echo_keyword
+
+    client = XiaohongshuMCPClient(settings=make_settings())
+    keywords = [f"alpha{i}" for i in range(6)]
+    results = client.search_many(keywords, limit=3)
+
+    assert [result["notes"][0].note_id for result in results] == keywords
+    assert client._conn is None
+    assert all(connection.closed for connection in fake_server.connections)
+
+
+def test_search_notes_rejects_malformed_json(fake_server):
+    fake_server.response_body = b"{not json"
+
+    client = XiaohongshuMCPClient(settings=make_settings())
+    with pytest.raises(MCPError, match="decode MCP response"):
+        client.search_notes("alpha")
+
+
+def test_search_notes_default_body_matches_dict_encoding(fake_server):
+    client = XiaohongshuMCPClient(settings=make_settings())
+    client.search_notes('小红书 "alpha"', limit=5)
+
+    assert json.loads(fake_server.connections[0].requests[0].body.decode("utf-8")) == {
+        "version": "2.0",
+        "arguments": {"keyword": '小红书 "alpha"', "page": 1, "page_size": 5},
+    }
+
+
+def test_ping_opens_the_connection_search_reuses(fake_server):
+    client = XiaohongshuMCPClient(settings=make_settings())
+    client.ping()
+    client.search_notes("alpha")
+
+    (connection,) = fake_server.connections
+    assert connection.connects == 1
+    assert len(connection.requests) == 1
+
+
+def test_ping_reconnects_instead_of_trusting_a_kept_alive_socket(fake_server):
+    client = XiaohongshuMCPClient(settings=make_settings())
+    client.ping()
+    client.ping()
+
+    first, second = fake_server.connections
+    assert first.closed
+    assert second.connects == 1
@@ -35,3 +35,22 @@ def test_extract_notes_handles_nested_payload():
     assert "Buy low" in first.image_texts
     assert second.note_id == "456"
     assert "Important data" in second.image_texts
+
+
+def test_combined_text_is_built_once():
+    note = XhsNote(note_id="1", title=" Alpha ", description="Alpha", image_texts=[" chart "])
+
+    text = note.combined_text()
+
+    assert text == "Alpha\n\nImage text:\nchart"
+    assert note.combined_text() is text
+    # The cached text is not part of equality or repr
+    assert note == XhsNote(note_id="1", title=" Alpha ", description="Alpha", image_texts=[" chart "])
+    assert "_combined_text" not in repr(note)
+
+
+def test_extract_notes_keeps_raw_only_on_request():
+    payload = {"notes": [{"note_id": "1", "title": "Alpha"}]}
+
+    assert extract_notes(payload)[0].raw == {}
+    assert extract_notes(payload, keep_raw=True)[0].raw is payload["notes"][0]
@@ -3,18 +3,27 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
 import json
 import sys
 from datetime import date
 from pathlib import Path
 from typing import Iterable, Optional
 
-from .config import get_settings
+from .config import Settings, get_settings
 from .mcp_client import MCPError, XiaohongshuMCPClient, iter_note_summaries
-from .summarizer import DEFAULT_SYSTEM_PROMPT, DeepSeekSummarizer, build_summary_prompt
+from .summarizer import build_summary_prompt
 
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
 
+
+@functools.lru_cache(maxsize=1)
 def build_parser() -> argparse.ArgumentParser:
+    # Built once and shared: parse_args does not modify the parser
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
         "--keyword",
@@ -74,10 +83,37 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _dumps(obj) -> bytes:
+    """Serialize ``obj`` as 2-space indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _default_keyword() -> str:
+    """Keyword used when ``--keyword`` is omitted; only evaluated in that case."""
+    return f"alpha pick {date.today():%Y-%m-%d}"
+
+
+def _save_json(path: Path, obj, encoded: Optional[bytes] = None) -> None:
+    """Write ``obj`` to ``path`` as indented JSON without building one big str.
+
+    ``encoded`` is reused when the caller already has the ``_dumps`` bytes;
+    without orjson the stdlib encoder streams chunks straight to the file.
+    """
+    if encoded is None and orjson is not None:
+        encoded = _dumps(obj)
+    if encoded is not None:
+        with open(path, "wb") as fh:
+            fh.write(encoded)
+        return
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(obj, fh, indent=2, ensure_ascii=False)
+
+
 def _print_note_dump(notes: Iterable[str], stream) -> None:
-    for entry in notes:
-        stream.write("\n" + entry + "\n")
-        stream.write("-" * 40 + "\n")
+    separator = "-" * 40
+    stream.write("".join(f"\n{entry}\n{separator}\n" for entry in notes))
 
 
 def main(argv: Optional[list[str]] = None, *, stream=None) -> int:
@@ -86,18 +122,28 @@ def main(argv: Optional[list[str]] = None, *, stream=None) -> int:
     stream = stream or sys.stdout
 
     settings = get_settings()
-    keyword = args.keyword or f"alpha pick {date.today():%Y-%m-%d}"
+    keyword = args.keyword or _default_keyword()
     prompt_template: Optional[str] = None
     if args.prompt_file:
         prompt_template = args.prompt_file.read_text(encoding="utf-8")
     elif args.prompt:
         prompt_template = args.prompt
-    prompt_text = build_summary_prompt(
-        keyword,
-        base_prompt=prompt_template or "Summarise how '{keyword}' is discussed in these notes.",
-    )
 
-    client = XiaohongshuMCPClient(settings=settings, api_key=args.mcp_api_key)
+    # The client keeps its HTTP connection alive between calls; close it on the way out
+    with XiaohongshuMCPClient(settings=settings, api_key=args.mcp_api_key) as client:
+        return _run(args, client, settings, keyword, prompt_template, stream)
+
+
+def _run(
+    args: argparse.Namespace,
+    client: XiaohongshuMCPClient,
+    settings: Settings,
+    keyword: str,
+    prompt_template: Optional[str],
+    stream,
+) -> int:
+    write = stream.write
+
     if args.debug:
         info = getattr(client, "connection_info", lambda: {
             "base_url": getattr(client, "base_url", "<unknown>"),
@@ -106,86 +152,111 @@ def main(argv: Optional[list[str]] = None, *, stream=None) -> int:
             "timeout": getattr(client, "timeout", "<unknown>"),
             "has_mcp_api_key": bool(getattr(client, "api_key", None)),
         })()
-        stream.write("MCP connection configuration:\n")
-        stream.write(f"  Base URL: {info.get('base_url', '<unknown>')}\n")
-        stream.write(f"  Search path: {info.get('search_path', '<unknown>')}\n")
-        stream.write(f"  Search URL: {info.get('search_url', '<unknown>')}\n")
-        stream.write(f"  Timeout: {info.get('timeout', '<unknown>')}s\n")
-        stream.write(
-            "  MCP API key: {}\n".format(
-                "configured" if info.get("has_mcp_api_key") else "not set"
-            )
-        )
-        stream.write(
-            "  DeepSeek API key: {}\n".format(
-                "configured" if settings.deepseek_api_key else "not set"
-            )
+        write(
+            "MCP connection configuration:\n"
+            f"  Base URL: {info.get('base_url', '<unknown>')}\n"
+            f"  Search path: {info.get('search_path', '<unknown>')}\n"
+            f"  Search URL: {info.get('search_url', '<unknown>')}\n"
+            f"  Timeout: {info.get('timeout', '<unknown>')}s\n"
+            f"  MCP API key: {'configured' if info.get('has_mcp_api_key') else 'not set'}\n"
+            f"  DeepSeek API key: {'configured' if settings.deepseek_api_key else 'not set'}\n"
         )
 
     if args.check_connection:
         try:
             client.ping()
         except MCPError as exc:
-            stream.write(f"Connection check failed: {exc}\n")
+            write(f"Connection check failed: {exc}\n")
             return 2
-        stream.write(f"MCP server at {client.base_url} is reachable.\n")
+        write(f"MCP server at {client.base_url} is reachable.\n")
         return 0
 
-    try:
-        client.ping()
-    except MCPError as exc:
-        stream.write(
-            "Error: MCP server is unreachable. "
-            "Run with --check-connection for more details.\n"
-        )
-        stream.write(f"Details: {exc}\n")
-        if not args.debug:
-            stream.write(
-                "Re-run with --debug to print the derived MCP connection settings.\n"
+    # Offline runs go straight to the search; a dead server still surfaces as its MCPError
+    if not args.offline:
+        try:
+            client.ping()
+        except MCPError as exc:
+            write(
+                "Error: MCP server is unreachable. "
+                "Run with --check-connection for more details.\n"
             )
-        return 2
+            write(f"Details: {exc}\n")
+            if not args.debug:
+                write(
+                    "Re-run with --debug to print the derived MCP connection settings.\n"
+                )
+            return 2
 
     try:
         result = client.search_notes(keyword, limit=max(args.count, 1))
     except MCPError as exc:
-        stream.write(f"Error: {exc}\n")
+        write(f"Error: {exc}\n")
         if not args.debug:
-            stream.write(
+            write(
                 "Re-run with --debug to print the derived MCP connection settings.\n"
             )
         return 2
 
     notes = result["notes"]
-    if args.show_raw:
-        stream.write(json.dumps(result["raw"], indent=2, ensure_ascii=False) + "\n")
-    if args.save_json:
-        args.save_json.write_text(json.dumps(result["raw"], indent=2, ensure_ascii=False), encoding="utf-8")
-        stream.write(f"Raw payload saved to {args.save_json}\n")
+    if args.show_raw or args.save_json:
+        # Serialize once and reuse the bytes for both outputs
+        raw_dump = _dumps(result["raw"]) if args.show_raw else None
+        if args.show_raw:
+            buffer = getattr(stream, "buffer", None)
+            if buffer is None:
+                write(raw_dump.decode("utf-8") + "\n")
+            else:
+                # Flush pending text output so the raw bytes land after it.
+                stream.flush()
+                buffer.write(raw_dump + b"\n")
+                buffer.flush()
+        if args.save_json:
+            _save_json(args.save_json, result["raw"], raw_dump)
+            write(f"Raw payload saved to {args.save_json}\n")
 
     if not notes:
-        stream.write(f"No notes found for keyword: {keyword}\n")
+        write(f"No notes found for keyword: {keyword}\n")
         return 0
 
-    stream.write(f"Retrieved {len(notes)} notes for keyword '{keyword}'.\n")
+    write(f"Retrieved {len(notes)} notes for keyword '{keyword}'.\n")
     _print_note_dump(iter_note_summaries(notes), stream)
 
     if args.offline:
-        stream.write("Offline mode enabled; skipping DeepSeek summarisation.\n")
+        write("Offline mode enabled; skipping DeepSeek summarisation.\n")
         return 0
 
+    from .summarizer import DEFAULT_SYSTEM_PROMPT, DeepSeekSummarizer
+
     try:
         summariser = DeepSeekSummarizer(settings=settings)
     except RuntimeError as exc:
-        stream.write(f"Skipping DeepSeek summarisation: {exc}\n")
+        write(f"Skipping DeepSeek summarisation: {exc}\n")
         return 0
 
-    summary = summariser.summarise(
+    prompt_text = build_summary_prompt(
+        keyword,
+        base_prompt=prompt_template or "Summarise how '{keyword}' is discussed in these notes.",
+    )
+    pieces = summariser.summarise_stream(
         notes,
         prompt=prompt_text,
         system_prompt=args.system_prompt or DEFAULT_SYSTEM_PROMPT,
     )
-    stream.write("\nDeepSeek summary\n=================\n")
-    stream.write(summary.response_text + "\n")
+    # Wait for the first non-blank piece so a failed request leaves no dangling header
+    first = next((piece for piece in pieces if piece.strip()), "")
+    write("\nDeepSeek summary\n=================\n")
+    # Print the rest as it is generated, trimmed like the full text used to be:
+    # trailing whitespace is held back until more text follows it
+    pending = ""
+    for piece in itertools.chain((first.lstrip(),), pieces):
+        text = piece.rstrip()
+        if text:
+            write(pending + text)
+            stream.flush()
+            pending = piece[len(text):]
+        else:
+            pending += piece
+    write("\n")
     return 0
 
 
@@ -34,7 +34,7 @@ class Settings:
         )
 
 
-@lru_cache()
+@lru_cache(maxsize=None)  # Unbounded: a plain dict lookup, no LRU bookkeeping
 def get_settings() -> Settings:
     return Settings.from_env()
 
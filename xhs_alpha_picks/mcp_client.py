@@ -2,16 +2,49 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+import copy
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPResponse,
+    HTTPSConnection,
+    RemoteDisconnected,
+)
 import json
-import socket
-from typing import Any, Dict, Iterable, List, Optional
-from urllib.error import HTTPError, URLError
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin, urlsplit, urlunsplit
-from urllib.request import Request, urlopen
 
 from .config import Settings, get_settings
 from .note_parser import XhsNote, extract_notes
 
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(body: bytes) -> Any:
+    """Parse a UTF-8 JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)  # the stdlib also decodes UTF-8 bytes itself
+
+
+# search_notes request body when no extra arguments are given; matches the
+# dict-built body key for key
+_SEARCH_BODY_TEMPLATE = (
+    b'{"version":"2.0","arguments":{"keyword":%s,"page":1,"page_size":%s}}'
+)
+
 
 class MCPError(RuntimeError):
     """Raised when the MCP server responds with an error."""
@@ -51,14 +84,31 @@ class XiaohongshuMCPClient:
             path = self.search_path.lstrip("/") if self.search_path else ""
             self.search_url = urljoin(self.base_url.rstrip("/") + "/", path)
 
-    def build_headers(self) -> Dict[str, str]:
-        headers = {
+        # Resolved once instead of on every search_notes request
+        self._search_endpoint = self._endpoint(self.search_url)
+        endpoint = urlsplit(self._search_endpoint)
+        self._search_target = urlunsplit(("", "", endpoint.path or "/", endpoint.query, ""))
+        # Kept open between search_notes calls; see _connection() and close()
+        self._conn: Optional[HTTPConnection] = None
+        self._headers: Dict[str, str] = {
             "Content-Type": "application/json",
             "Accept": "application/json, text/event-stream",
         }
         if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        return headers
+            self._headers["Authorization"] = f"Bearer {self.api_key}"
+
+        # Fixed for the client's lifetime, so built once; connection_info() returns copies
+        self._connection_info: Dict[str, Any] = {
+            "base_url": self.base_url,
+            "search_path": self.search_path,
+            "search_url": self.search_url,
+            "timeout": self.timeout,
+            "has_mcp_api_key": bool(self.api_key),
+        }
+
+    def build_headers(self) -> Dict[str, str]:
+        """Return a copy of the request headers sent with every search."""
+        return dict(self._headers)
 
     def _endpoint(self, path: str) -> str:
         if path.startswith("http://") or path.startswith("https://"):
@@ -66,34 +116,72 @@ class XiaohongshuMCPClient:
         return urljoin(self.base_url.rstrip("/") + "/", path.lstrip("/"))
 
     def connection_info(self) -> Dict[str, Any]:
-        return {
-            "base_url": self.base_url,
-            "search_path": self.search_path,
-            "search_url": getattr(self, "search_url", self._endpoint(self.search_path)),
-            "timeout": self.timeout,
-            "has_mcp_api_key": bool(self.api_key),
-        }
+        return dict(self._connection_info)
 
     def ping(self) -> None:
-        """Best-effort connectivity probe for the MCP server host."""
+        """Best-effort connectivity probe for the MCP server host.
 
-        from urllib.parse import urlsplit
+        Always opens a fresh connection, even if one is already kept alive (the
+        server may have dropped it), and keeps it for ``search_notes`` to reuse.
+        """
 
-        parsed = urlsplit(self.base_url or self.search_url)
-        host = parsed.hostname
+        host = urlsplit(self._search_endpoint).hostname
         if not host:
             raise MCPError(f"Unable to parse MCP base URL: {self.base_url!r}")
-        port = parsed.port
-        if not port:
-            port = 443 if parsed.scheme == "https" else 80
+        self.close()
+        connection = self._connection()
         try:
-            with socket.create_connection((host, port), timeout=self.timeout):
-                return
+            connection.connect()
         except OSError as exc:
+            self.close()
             raise MCPError(
-                f"Unable to reach MCP server at {self.base_url} (host {host}:{port}): {exc}"
+                f"Unable to reach MCP server at {self.base_url} "
+                f"(host {host}:{connection.port}): {exc}"
             ) from exc
 
+    def _connection(self) -> HTTPConnection:
+        """Return the persistent connection to the search endpoint, opening it lazily."""
+        if self._conn is None:
+            endpoint = urlsplit(self._search_endpoint)
+            connection_cls = HTTPSConnection if endpoint.scheme == "https" else HTTPConnection
+            self._conn = connection_cls(endpoint.hostname, endpoint.port, timeout=self.timeout)
+        return self._conn
+
+    def close(self) -> None:
+        """Close the persistent HTTP connection, if one is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "XiaohongshuMCPClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _send(self, body: bytes) -> tuple[HTTPResponse, bytes]:
+        connection = self._connection()
+        connection.request("POST", self._search_target, body=body, headers=self._headers)
+        response = connection.getresponse()
+        return response, response.read()
+
+    def _post(self, url: str, body: bytes) -> bytes:
+        """POST ``body`` to the search endpoint over the kept-alive connection."""
+        try:
+            try:
+                response, response_body = self._send(body)
+            except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server dropped an idle keep-alive socket; retry once on a fresh one
+                self.close()
+                response, response_body = self._send(body)
+        except (OSError, HTTPException) as exc:
+            self.close()
+            raise MCPError(f"Failed to reach MCP server at {url}: {exc}") from exc
+        if response.status >= 400:
+            error_body = response_body.decode("utf-8", "ignore")
+            raise MCPError(f"MCP server error {response.status} calling {url}: {error_body}")
+        return response_body
+
     def search_notes(
         self,
         keyword: str,
@@ -103,55 +191,81 @@ class XiaohongshuMCPClient:
     ) -> Dict[str, Any]:
         """Invoke the MCP search tool and return parsed notes alongside raw payload."""
 
-        arguments: Dict[str, Any] = {
-            "keyword": keyword,
-            "page": 1,
-            "page_size": limit,
-        }
         if raw_payload:
-            arguments.update(raw_payload)
-        payload: Dict[str, Any] = {
-            "version": "2.0",
-            "arguments": arguments,
-        }
-        url = self._endpoint(getattr(self, "search_url", self.search_path))
-        request = Request(
-            url,
-            data=json.dumps(payload).encode("utf-8"),
-            headers=self.build_headers(),
-            method="POST",
-        )
-        try:
-            with urlopen(request, timeout=self.timeout) as response:
-                response_body = response.read()
-        except HTTPError as exc:
-            error_body = exc.read().decode("utf-8", "ignore")
-            raise MCPError(
-                f"MCP server error {exc.code} calling {url}: {error_body}"
-            ) from exc
-        except URLError as exc:
-            raise MCPError(f"Failed to reach MCP server at {url}: {exc}") from exc
+            # Extra arguments from raw_payload never override the required search fields
+            arguments: Dict[str, Any] = {
+                **raw_payload,
+                "keyword": keyword,
+                "page": 1,
+                "page_size": limit,
+            }
+            body = _dumps({"version": "2.0", "arguments": arguments})
+        else:
+            # Fixed-shape request: only the keyword and page size need encoding
+            body = _SEARCH_BODY_TEMPLATE % (_dumps(keyword), _dumps(limit))
+        url = self._search_endpoint
+        response_body = self._post(url, body)
         try:
-            data = json.loads(response_body.decode("utf-8"))
-        except json.JSONDecodeError as exc:
+            data = _loads(response_body)
+        except json.JSONDecodeError as exc:  # orjson.JSONDecodeError subclasses it
             raise MCPError("Failed to decode MCP response as JSON") from exc
+        # Drop the raw body before extracting notes so it is not held alongside the tree
+        del response_body
         notes = extract_notes(data)
         return {"notes": notes, "raw": data}
 
+    def search_many(
+        self,
+        keywords: Iterable[str],
+        *,
+        limit: int = 10,
+        raw_payload: Optional[Dict[str, Any]] = None,
+        max_workers: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """Run ``search_notes`` for several keywords concurrently, in keyword order."""
+
+        keywords = list(keywords)
+        if len(keywords) <= 1:
+            return [
+                self.search_notes(keyword, limit=limit, raw_payload=raw_payload)
+                for keyword in keywords
+            ]
+
+        # http.client connections are not thread-safe, so each worker thread
+        # searches through its own copy of this client and its own socket
+        local = threading.local()
+        clients: List[XiaohongshuMCPClient] = []
 
-def iter_note_summaries(notes: Iterable[XhsNote]) -> List[str]:
-    """Return formatted strings ready for prompting or console printing."""
+        def search(keyword: str) -> Dict[str, Any]:
+            client = getattr(local, "client", None)
+            if client is None:
+                client = copy.copy(self)
+                client._conn = None
+                local.client = client
+                clients.append(client)
+            return client.search_notes(keyword, limit=limit, raw_payload=raw_payload)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(keywords))) as pool:
+                return list(pool.map(search, keywords))
+        finally:
+            for client in clients:
+                client.close()
+
+
+def iter_note_summaries(notes: Iterable[XhsNote]) -> Iterator[str]:
+    """Yield formatted strings ready for prompting or console printing."""
 
-    formatted: List[str] = []
     for index, note in enumerate(notes, 1):
-        header_parts = [f"Note {index}"]
-        if note.author:
-            header_parts.append(f"by {note.author}")
-        if note.url:
-            header_parts.append(note.url)
-        header = " - ".join(header_parts)
-        formatted.append(
-            f"{header}\nID: {note.note_id}\n{note.combined_text() or 'No text payload available.'}"
+        yield (
+            f"Note {index}"
+            f"{f' - by {note.author}' if note.author else ''}"
+            f"{f' - {note.url}' if note.url else ''}"
+            f"\nID: {note.note_id}\n{note.combined_text() or 'No text payload available.'}"
         )
-    return formatted
 
+
+def format_note_summaries(notes: Iterable[XhsNote]) -> List[str]:
+    """Return the ``iter_note_summaries`` strings as a list."""
+
+    return list(iter_note_summaries(notes))
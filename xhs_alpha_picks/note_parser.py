@@ -3,10 +3,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+# Candidate keys for each note field, in priority order.
+_ID_KEYS = ("note_id", "id", "noteId", "nid")
+_TITLE_KEYS = ("title", "note_title", "name")
+_DESCRIPTION_KEYS = ("desc", "description", "note_desc", "content", "text")
+_AUTHOR_KEYS = ("user_name", "user_nickname", "author", "nickname")
+_URL_KEYS = ("note_url", "url", "share_link", "link")
+# Lowercased keys that mark a dict as a note in _maybe_note.
+_NOTE_KEY_SET = frozenset(("note_id", "noteid", "id"))
+_TEXT_FRAGMENT_KEYS = ("image_texts", "image_text", "ocr_texts", "ocr_text", "texts")
 
-@dataclass
+
+@dataclass(slots=True)
 class XhsNote:
     """A simplified representation of a Xiaohongshu note."""
 
@@ -17,151 +27,142 @@ class XhsNote:
     image_texts: Sequence[str] = field(default_factory=list)
     url: Optional[str] = None
     raw: Dict[str, Any] = field(default_factory=dict)
+    # Text built by the first combined_text call; notes are not modified once parsed
+    _combined_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def combined_text(self) -> str:
         """Return a readable string mixing title, description, and OCR snippets."""
 
+        if self._combined_text is None:
+            self._combined_text = self._build_combined_text()
+        return self._combined_text
+
+    def _build_combined_text(self) -> str:
         parts: List[str] = []
-        if self.title:
-            parts.append(self.title.strip())
-        if self.description and self.description.strip() not in parts:
-            parts.append(self.description.strip())
+        title = self.title.strip() if self.title else ""
+        if title:
+            parts.append(title)
+        description = self.description.strip() if self.description else ""
+        if description and description != title:
+            parts.append(description)
         if self.image_texts:
-            ocr_text = "\n".join(t.strip() for t in self.image_texts if t and t.strip())
+            ocr_text = "\n".join(
+                stripped for stripped in (t.strip() for t in self.image_texts if t) if stripped
+            )
             if ocr_text:
                 parts.append(f"Image text:\n{ocr_text}")
-        return "\n\n".join(part for part in parts if part)
+        return "\n\n".join(parts)
+
 
+def extract_notes(payload: Any, *, keep_raw: bool = False) -> List[XhsNote]:
+    """Extract note dictionaries from an arbitrary MCP payload.
 
-def extract_notes(payload: Any) -> List[XhsNote]:
-    """Extract note dictionaries from an arbitrary MCP payload."""
+    Each note's source dict is kept on ``XhsNote.raw`` only when ``keep_raw`` is
+    set, so the parsed notes do not keep the whole payload alive on their own.
+    """
 
-    note_dicts = _collect_note_dicts(payload)
     notes: List[XhsNote] = []
-    for raw_note in note_dicts:
-        note_id = _first_str(
-            raw_note,
-            (
-                "note_id",
-                "id",
-                "noteId",
-                "nid",
-            ),
-        )
+    for raw_note in _iter_note_dicts(payload):
+        note_id = _get_note_id(raw_note)
         if not note_id:
             continue
-        title = _first_str(raw_note, ("title", "note_title", "name"))
-        description = _first_str(
-            raw_note,
-            (
-                "desc",
-                "description",
-                "note_desc",
-                "content",
-                "text",
-            ),
-        )
-        author = _first_str(
-            raw_note,
-            (
-                "user_name",
-                "user_nickname",
-                "author",
-                "nickname",
-            ),
-        )
-        url = _first_str(
-            raw_note,
-            (
-                "note_url",
-                "url",
-                "share_link",
-                "link",
-            ),
-        )
+        title = _get_title(raw_note)
+        description = _get_description(raw_note)
+        author = _get_author(raw_note)
+        url = _get_url(raw_note)
         image_texts = _collect_text_fragments(raw_note)
-        notes.append(
-            XhsNote(
-                note_id=note_id,
-                title=title,
-                description=description,
-                author=author,
-                image_texts=image_texts,
-                url=url,
-                raw=raw_note,
-            )
-        )
+        raw = raw_note if keep_raw else {}
+        # Positional, in XhsNote field order, to skip keyword matching per note
+        notes.append(XhsNote(note_id, title, description, author, image_texts, url, raw))
     return notes
 
 
-def _collect_note_dicts(payload: Any) -> List[Dict[str, Any]]:
-    """Recursively search for items that look like Xiaohongshu notes."""
+def _iter_note_dicts(payload: Any) -> Iterator[Dict[str, Any]]:
+    """Yield items that look like Xiaohongshu notes, depth-first in document order.
+
+    Walks an explicit stack rather than recursing, so no per-level match lists
+    are built and re-extended on the way back up.
+    """
 
-    matches: List[Dict[str, Any]] = []
-    if isinstance(payload, dict):
-        candidate = _maybe_note(payload)
-        if candidate:
-            matches.append(candidate)
-        for value in payload.values():
-            matches.extend(_collect_note_dicts(value))
-    elif isinstance(payload, (list, tuple, set)):
-        for item in payload:
-            matches.extend(_collect_note_dicts(item))
-    return matches
+    stack: List[Any] = [payload]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        value = pop()
+        if isinstance(value, dict):
+            candidate = _maybe_note(value)
+            if candidate:
+                yield candidate
+            extend(reversed(list(value.values())))
+        elif isinstance(value, (list, tuple)):
+            extend(reversed(value))
+        elif isinstance(value, set):
+            extend(reversed(list(value)))
 
 
 def _maybe_note(value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Return the dictionary if it resembles a note payload."""
 
-    lowered_keys = {key.lower() for key in value}
-    note_keys = {"note_id", "noteid", "id", "noteid"}
-    if lowered_keys & note_keys:
-        return value
-    if "note_id" in value or "noteId" in value or "id" in value:
-        return value
+    for key in value:
+        # Exact-case hit first; only lowercase keys that miss
+        if key in _NOTE_KEY_SET or key.lower() in _NOTE_KEY_SET:
+            return value
     return None
 
 
-def _first_str(data: Dict[str, Any], keys: Iterable[str]) -> Optional[str]:
-    for key in keys:
-        if key in data and isinstance(data[key], str) and data[key].strip():
-            return data[key]
-    return None
+def _first_str_getter(keys: Tuple[str, ...]) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """Return a function giving the first non-blank string under ``keys`` in a dict."""
+
+    def first_str(data: Dict[str, Any]) -> Optional[str]:
+        for key in keys:
+            value = data.get(key)
+            if isinstance(value, str) and value.strip():
+                return value
+        return None
+
+    return first_str
+
+
+# Built once so extract_notes does not pass a key table on every lookup.
+_get_note_id = _first_str_getter(_ID_KEYS)
+_get_title = _first_str_getter(_TITLE_KEYS)
+_get_description = _first_str_getter(_DESCRIPTION_KEYS)
+_get_author = _first_str_getter(_AUTHOR_KEYS)
+_get_url = _first_str_getter(_URL_KEYS)
 
 
 def _collect_text_fragments(raw_note: Dict[str, Any]) -> List[str]:
     """Collect OCR or image related text fragments."""
 
-    fragments: List[str] = []
-    candidate_keys = [
-        "image_texts",
-        "image_text",
-        "ocr_texts",
-        "ocr_text",
-        "texts",
-    ]
-    for key in candidate_keys:
-        value = raw_note.get(key)
-        if isinstance(value, str) and value.strip():
-            fragments.append(value)
-        elif isinstance(value, Sequence):
-            fragments.extend(
-                str(item) for item in value if isinstance(item, str) and item.strip()
-            )
-    # also look for nested OCR structures
-    for key, value in raw_note.items():
-        if isinstance(value, dict):
-            fragments.extend(_collect_text_fragments(value))
-        elif isinstance(value, list):
-            for item in value:
-                if isinstance(item, dict):
-                    fragments.extend(_collect_text_fragments(item))
     deduped: List[str] = []
     seen = set()
-    for fragment in fragments:
-        normalized = fragment.strip()
-        if normalized and normalized not in seen:
-            seen.add(normalized)
-            deduped.append(normalized)
+    # Nested OCR structures are visited depth-first from an explicit stack,
+    # in the same order the recursive walk used
+    stack: List[Dict[str, Any]] = [raw_note]
+    while stack:
+        data = stack.pop()
+        # Candidate keys are read in priority order rather than dict order,
+        # so a note's fragment order does not depend on its key layout
+        for key in _TEXT_FRAGMENT_KEYS:
+            value = data.get(key)
+            if isinstance(value, str):
+                values: Iterable[Any] = (value,)
+            elif isinstance(value, Sequence):
+                values = value
+            else:
+                continue
+            for item in values:
+                if not isinstance(item, str):
+                    continue
+                normalized = item.strip()
+                if normalized and normalized not in seen:
+                    seen.add(normalized)
+                    deduped.append(normalized)
+        children: List[Dict[str, Any]] = []
+        for value in data.values():
+            if isinstance(value, dict):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, dict))
+        stack.extend(reversed(children))
     return deduped
-
@@ -2,14 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
-
-try:  # pragma: no cover - optional dependency
-    from openai import OpenAI
-except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None  # type: ignore
+from typing import Any, Iterable, Iterator, List, Optional
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from .config import Settings, get_settings
 from .mcp_client import iter_note_summaries
@@ -28,7 +24,7 @@ DEFAULT_USER_PROMPT = (
 )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SummaryResult:
     """Wrapper for summarisation results."""
 
@@ -38,6 +34,25 @@ class SummaryResult:
     total_notes: int
 
 
+@lru_cache(maxsize=4)
+def _openai_client(api_key: str, base_url: str) -> Any:
+    """Return the shared OpenAI client for a key and endpoint.
+
+    Summarisers with the same settings share one client and so one HTTP
+    connection pool.
+    """
+
+    # Imported here: the openai SDK takes a noticeable time to import, and
+    # callers that never summarise (offline runs, connection checks) skip it.
+    try:  # pragma: no cover - optional dependency
+        from openai import OpenAI
+    except ImportError:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "The 'openai' package is required for DeepSeek summarisation."
+        ) from None
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
 class DeepSeekSummarizer:
     """Call the DeepSeek Responses API to generate textual summaries."""
 
@@ -48,9 +63,7 @@ class DeepSeekSummarizer:
             raise RuntimeError(
                 "DEEPSEEK_API_KEY is not configured. Export it or pass a Settings with the key."
             )
-        if OpenAI is None:
-            raise RuntimeError("The 'openai' package is required for DeepSeek summarisation.")
-        self.client = OpenAI(api_key=self.settings.deepseek_api_key, base_url=self.settings.deepseek_api_base)
+        self.client = _openai_client(self.settings.deepseek_api_key, self.settings.deepseek_api_base)
 
     def summarise(
         self,
@@ -59,6 +72,29 @@ class DeepSeekSummarizer:
         prompt: Optional[str] = None,
         system_prompt: Optional[str] = None,
     ) -> SummaryResult:
+        note_list = list(notes)
+        pieces = self.summarise_stream(note_list, prompt=prompt, system_prompt=system_prompt)
+        summary_text = "".join(pieces).strip()
+        return SummaryResult(
+            prompt=prompt or DEFAULT_USER_PROMPT,
+            response_text=summary_text,
+            used_model=self.model,
+            total_notes=len(note_list),
+        )
+
+    def summarise_stream(
+        self,
+        notes: Iterable[XhsNote],
+        *,
+        prompt: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Start the completion and return an iterator over its text pieces.
+
+        Notes are validated and the request is sent before this returns, so
+        bad input and API errors are raised here rather than on iteration.
+        """
+
         note_list = list(notes)
         if not note_list:
             raise ValueError("No notes provided for summarisation")
@@ -78,16 +114,21 @@ class DeepSeekSummarizer:
                 },
             ],
             temperature=0.3,
+            stream=True,
         )
-        summary_text = (completion.choices[0].message.content or "").strip()
-        return SummaryResult(
-            prompt=user_prompt,
-            response_text=summary_text,
-            used_model=self.model,
-            total_notes=len(note_list),
-        )
+        return _iter_deltas(completion)
+
+
+def _iter_deltas(completion: Iterable[Any]) -> Iterator[str]:
+    for chunk in completion:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
 
 
+@lru_cache(maxsize=32)
 def build_summary_prompt(keyword: str, *, base_prompt: Optional[str] = None) -> str:
     template = base_prompt or DEFAULT_USER_PROMPT
     return template.replace("{keyword}", keyword)